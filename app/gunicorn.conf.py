@@ -0,0 +1,18 @@
+import gc
+import os
+
+# Load the application (and run home.warmup) once in the master process,
+# so that workers share imported modules and warmed caches copy-on-write.
+preload_app = bool(int(os.environ.get("GUNICORN_PRELOAD", default=1)))
+
+workers = int(os.environ.get("GUNICORN_WORKERS", default=1))
+# More than one thread makes gunicorn use gthread workers. The CONCURRENCY
+# limits of ADMISSION_CONTROL are per process, they only shed load when a
+# process serves more requests at once than the limit.
+threads = int(os.environ.get("GUNICORN_THREADS", default=8))
+
+
+def when_ready(server):
+    # Move everything allocated so far out of the collector's reach, otherwise
+    # the first collection in each worker touches (and copies) every page.
+    gc.freeze()
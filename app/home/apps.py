@@ -6,4 +6,5 @@ class HomeConfig(AppConfig):
     name = 'home'
 
     def ready(self):
+        import home.cache
         import home.signals
@@ -0,0 +1,58 @@
+import urllib.error
+import urllib.request
+from urllib.parse import parse_qsl, urlencode
+
+from django.conf import settings
+
+from home import jobs
+
+CACHEABLE_METHODS = ('GET', 'HEAD')
+
+
+def is_anonymous(request):
+    # the same test as the proxy_no_cache of nginx/nginx.conf
+    return ('HTTP_AUTHORIZATION' not in request.META
+            and settings.SESSION_COOKIE_NAME not in request.COOKIES)
+
+
+def is_cacheable(request):
+    return (settings.HTTP_CACHE['MAX_AGE'] > 0
+            and request.method in CACHEABLE_METHODS
+            and request.resolver_match is not None
+            and request.resolver_match.url_name in settings.HTTP_CACHE['ROUTES']
+            and is_anonymous(request))
+
+
+def is_canonical(query_string):
+    """Whether the parameters are sorted already, however their values are encoded."""
+    params = parse_qsl(query_string, keep_blank_values=True)
+    return params == sorted(params)
+
+
+def canonical_query_string(query_dict):
+    """Query string with sorted parameters and values, nginx caches one entry per query string."""
+    return urlencode(sorted((key, value) for key in query_dict for value in query_dict.getlist(key)))
+
+
+@jobs.register('refresh_http_cache')
+def refresh(paths):
+    """Have nginx fetch fresh copies of the cached ``paths``.
+
+    Requests with ``X-Cache-Refresh`` bypass the cache and replace the cached
+    response, nginx only honours the header from the internal network.
+    """
+    config = settings.HTTP_CACHE
+    for host in config['REFRESH_HOSTS']:
+        for accept in config['REFRESH_ACCEPT']:
+            for path in paths:
+                request = urllib.request.Request(config['REFRESH_URL'].rstrip('/') + path, headers={
+                    'Host': host,
+                    'Accept': accept,
+                    'X-Cache-Refresh': '1',
+                })
+                try:
+                    urllib.request.urlopen(request, timeout=config['REFRESH_TIMEOUT']).close()
+                except urllib.error.HTTPError as e:
+                    # deleted objects answer 404, which is what should be cached
+                    if e.code != 404:
+                        raise
@@ -0,0 +1,55 @@
+from django.conf import settings
+from django.urls import get_script_prefix, get_urlconf, reverse
+
+from rest_framework import serializers
+
+PLACEHOLDER = 'lookup-placeholder'
+
+# (urlconf, script prefix, view name, lookup kwarg) -> (path before the lookup value, path after it)
+_url_templates = {}
+
+
+def get_url_template(view_name, lookup_url_kwarg):
+    key = (get_urlconf() or settings.ROOT_URLCONF, get_script_prefix(), view_name, lookup_url_kwarg)
+    if key not in _url_templates:
+        path = reverse(view_name, kwargs={lookup_url_kwarg: PLACEHOLDER})
+        _url_templates[key] = tuple(path.split(PLACEHOLDER))
+    return _url_templates[key]
+
+
+class CachedUrlMixin:
+    """Builds hyperlinks from a per-process url template instead of reversing every url.
+
+    Only integer lookups are built from the template, which is most of them.
+    Anything else (versioning, format suffixes, other lookup values) goes
+    through ``reverse()`` as before, so the output is the same either way.
+    """
+
+    def get_url(self, obj, view_name, request, format):
+        if hasattr(obj, 'pk') and obj.pk in (None, ''):
+            return None
+
+        lookup_value = getattr(obj, self.lookup_field)
+        if (format or not isinstance(lookup_value, int)
+                or getattr(request, 'versioning_scheme', None) is not None):
+            return super().get_url(obj, view_name, request, format)
+
+        before, after = get_url_template(view_name, self.lookup_url_kwarg)
+        if request is not None:
+            before = self._build_absolute_uri(request, before)
+        return f'{before}{lookup_value}{after}'
+
+    @staticmethod
+    def _build_absolute_uri(request, path):
+        cache = request.__dict__.setdefault('_absolute_uris', {})
+        if path not in cache:
+            cache[path] = request.build_absolute_uri(path)
+        return cache[path]
+
+
+class CachedHyperlinkedRelatedField(CachedUrlMixin, serializers.HyperlinkedRelatedField):
+    pass
+
+
+class CachedHyperlinkedIdentityField(CachedUrlMixin, serializers.HyperlinkedIdentityField):
+    pass
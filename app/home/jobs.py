@@ -0,0 +1,145 @@
+import hashlib
+import json
+import logging
+import threading
+import time
+import traceback
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import IntegrityError, close_old_connections, connection, transaction
+from django.utils import timezone
+
+from home.models import Job
+
+logger = logging.getLogger(__name__)
+
+_handlers = {}
+
+
+def register(name):
+    """Register the decorated function as the handler of jobs called ``name``."""
+    def decorator(func):
+        _handlers[name] = func
+        return func
+    return decorator
+
+
+def get_handler(name):
+    return _handlers[name]
+
+
+def job_key(kwargs):
+    return hashlib.sha1(json.dumps(kwargs, sort_keys=True).encode()).hexdigest()
+
+
+def enqueue(name, **kwargs):
+    """Queue a job, or run it right away unless ``JOBS_ASYNC`` is enabled.
+
+    A job identical to one that is still pending is dropped.
+    """
+    if not settings.JOBS_ASYNC:
+        get_handler(name)(**kwargs)
+        return
+
+    Job.objects.bulk_create([
+        Job(name=name, key=job_key(kwargs), kwargs=kwargs,
+            max_attempts=settings.JOBS_MAX_ATTEMPTS),
+    ], ignore_conflicts=True)
+
+
+def claim(limit=1):
+    with transaction.atomic():
+        jobs = list(Job.objects.all().ready().select_for_update(skip_locked=True)[:limit])
+        now = timezone.now()
+        for job in jobs:
+            job.status = Job.RUNNING
+            job.attempts += 1
+            job.locked_at = now
+            job.save(update_fields=['status', 'attempts', 'locked_at'])
+    return jobs
+
+
+def _requeue(job, run_at):
+    job.status = Job.PENDING
+    job.run_at = run_at
+    job.locked_at = None
+    try:
+        with transaction.atomic():
+            job.save(update_fields=['status', 'run_at', 'locked_at', 'last_error'])
+    except IntegrityError:
+        # an identical job has been queued meanwhile and will do the work
+        job.delete()
+
+
+def backoff(attempts):
+    return min(settings.JOBS_RETRY_BACKOFF * 2 ** (attempts - 1), settings.JOBS_RETRY_BACKOFF_MAX)
+
+
+def run(job):
+    started = time.perf_counter()
+    try:
+        get_handler(job.name)(**job.kwargs)
+    except Exception:
+        job.last_error = traceback.format_exc()
+        if job.attempts >= job.max_attempts:
+            logger.error("job %s failed after %s attempts", job, job.attempts)
+            job.status = Job.FAILED
+            job.save(update_fields=['status', 'last_error'])
+        else:
+            delay = backoff(job.attempts)
+            logger.warning("job %s failed, retrying in %ss", job, delay)
+            _requeue(job, timezone.now() + timedelta(seconds=delay))
+        return False
+
+    job.delete()
+    logger.debug("job %s done in %.1fms, waited %.1fs", job,
+                 (time.perf_counter() - started) * 1000,
+                 (job.locked_at - job.run_at).total_seconds())
+    return True
+
+
+def requeue_stale(timeout):
+    """Give jobs whose worker died while running them back to the queue."""
+    for job in Job.objects.all().stale(timeout):
+        logger.warning("job %s was abandoned, requeueing", job)
+        _requeue(job, timezone.now())
+
+
+def work(stop, poll_interval=1, once=False):
+    """Run jobs until ``stop`` is set, or until the queue is empty if ``once``.
+
+    Errors outside the handlers (a database restart, say) are logged and the
+    worker carries on after ``poll_interval``, jobs it was running are
+    requeued once they are stale.
+    """
+    try:
+        while not stop.is_set():
+            try:
+                jobs = claim()
+                if not jobs:
+                    if once:
+                        return
+                    stop.wait(poll_interval)
+                    continue
+
+                for job in jobs:
+                    run(job)
+            except Exception:
+                logger.exception("job worker failed, retrying in %ss", poll_interval)
+                close_old_connections()
+                stop.wait(poll_interval)
+    finally:
+        connection.close()
+
+
+def start_workers(concurrency, poll_interval=1, once=False):
+    stop = threading.Event()
+    threads = [
+        threading.Thread(target=work, args=(stop, poll_interval, once),
+                         name=f'job-worker-{i}', daemon=True)
+        for i in range(concurrency)
+    ]
+    for thread in threads:
+        thread.start()
+    return stop, threads
@@ -0,0 +1,50 @@
+import json
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from home.profiling import profile_search
+from home.views import FoodViewSet
+
+
+def default_host():
+    """A host that ALLOWED_HOSTS accepts, wildcard entries are not hosts themselves."""
+    host = settings.ALLOWED_HOSTS[0] if settings.ALLOWED_HOSTS else '*'
+    if host == '*':
+        return 'localhost'
+    return host.lstrip('.')
+
+
+class Command(BaseCommand):
+    help = "Profile the food search for the given ingredients and explain its query."
+
+    def add_arguments(self, parser):
+        parser.add_argument('ingredients', nargs='+')
+        parser.add_argument('--page', type=int, default=1)
+        parser.add_argument('--host', default=default_host(),
+                            help="Host of the urls in the serialized foods.")
+        parser.add_argument('--json', action='store_true')
+
+    def handle(self, *args, **options):
+        request = APIRequestFactory().get('/foods/', {'ingredient': options['ingredients'],
+                                                      'page': options['page']},
+                                          HTTP_HOST=options['host'])
+        view = FoodViewSet(request=Request(request), args=(), kwargs={},
+                           format_kwarg=None, action='list')
+        profile = profile_search(view)
+
+        if options['json']:
+            self.stdout.write(json.dumps(profile, indent=2))
+            return
+
+        self.stdout.write(f"SQL:\n{profile['sql']}\n")
+        self.stdout.write(f"Plan:\n{profile['plan']}\n")
+        for name, used in profile['indexes'].items():
+            self.stdout.write(f"Index {name}: {'used' if used else 'not used'}")
+        for name, stage in profile['stages'].items():
+            self.stdout.write(f"{name}: {stage['time_ms']:.1f}ms, {stage['queries']} queries")
+        self.stdout.write(f"total: {profile['total']['time_ms']:.1f}ms, "
+                          f"{profile['total']['queries']} queries")
@@ -0,0 +1,50 @@
+import json
+import time
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+
+from home import replay
+
+
+class Command(BaseCommand):
+    help = "Replay a request log written by RequestLogMiddleware and report latencies per route."
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help="JSONL request log.")
+        parser.add_argument('--target',
+                            help="Base url of the server to load, e.g. http://localhost:8000. "
+                                 "Requests are sent to the views in process when omitted.")
+        parser.add_argument('--concurrency', type=int, default=1)
+        parser.add_argument('--rate', type=float, help="Requests per second, unlimited if omitted.")
+        parser.add_argument('--methods', default='GET,HEAD',
+                            help="Comma separated methods to replay, the others are skipped.")
+        parser.add_argument('--token', help="Api token sent to the target.")
+        parser.add_argument('--user', help="Username the in process requests are authenticated as.")
+        parser.add_argument('--json', action='store_true')
+
+    def handle(self, *args, **options):
+        entries = replay.load(options['path'], options['methods'].upper().split(','))
+        if options['target']:
+            client = replay.HttpClient(options['target'], options['token'])
+        else:
+            user = User.objects.get(username=options['user']) if options['user'] else None
+            client = replay.InProcessClient(user)
+
+        started = time.perf_counter()
+        results = replay.replay(entries, client, options['concurrency'], options['rate'])
+        elapsed = time.perf_counter() - started
+        summary = replay.summarize(results)
+
+        if options['json']:
+            self.stdout.write(json.dumps(summary, indent=2))
+            return
+
+        self.stdout.write(f"{len(results)} requests in {elapsed:.1f}s "
+                          f"({len(results) / elapsed if elapsed else 0:.1f}/s)")
+        self.stdout.write(f"{'route':<30} {'requests':>8} {'p50':>9} {'p90':>9} {'p99':>9} "
+                          f"{'max':>9} {'4xx':>6} {'errors':>6}")
+        for route, row in summary.items():
+            self.stdout.write(f"{route:<30} {row['requests']:>8} {row['p50']:>7.1f}ms "
+                              f"{row['p90']:>7.1f}ms {row['p99']:>7.1f}ms {row['max']:>7.1f}ms "
+                              f"{row['client_errors']:>6.1%} {row['errors']:>6.1%}")
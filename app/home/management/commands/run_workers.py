@@ -0,0 +1,56 @@
+import json
+import logging
+import signal
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from home import jobs
+from home.models import Job
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    help = "Run background jobs queued in the database."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--concurrency', type=int, default=1,
+                            help="Number of worker threads.")
+        parser.add_argument('--poll-interval', type=float, default=1,
+                            help="Seconds to wait when the queue is empty.")
+        parser.add_argument('--once', action='store_true',
+                            help="Exit once the queue is drained.")
+        parser.add_argument('--stats', action='store_true',
+                            help="Print queue depth and latency per job name and exit.")
+
+    def handle(self, *args, **options):
+        if options['stats']:
+            self.stdout.write(json.dumps(Job.objects.all().stats(), indent=2))
+            return
+
+        jobs.requeue_stale(settings.JOBS_STALE_TIMEOUT)
+        stop, threads = jobs.start_workers(options['concurrency'],
+                                           options['poll_interval'], options['once'])
+        signal.signal(signal.SIGTERM, lambda *_: stop.set())
+        self.stdout.write(f"Started {len(threads)} job workers")
+
+        try:
+            for thread in threads:
+                while thread.is_alive():
+                    thread.join(settings.JOBS_STALE_TIMEOUT)
+                    if thread.is_alive() and not stop.is_set():
+                        self.requeue_stale()
+        except KeyboardInterrupt:
+            stop.set()
+            for thread in threads:
+                thread.join()
+
+    @staticmethod
+    def requeue_stale():
+        try:
+            jobs.requeue_stale(settings.JOBS_STALE_TIMEOUT)
+        except Exception:
+            logger.exception("requeueing stale jobs failed")
+            close_old_connections()
@@ -1,11 +1,86 @@
-from django.db import models
+from datetime import timedelta
+
+from django.contrib.postgres.aggregates import StringAgg
+from django.contrib.postgres.search import SearchVector
+from django.db import models, transaction
+from django.db.models import Count, Min, OuterRef, Q, Subquery, Value
+from django.db.models.functions import Coalesce, Concat
+from django.utils import timezone
 
 
 class FoodQuerySet(models.QuerySet):
     def search(self, ingredients):
         return self.filter(_ingredients_vector=" ".join(ingredients))
 
+    def update_vectors(self):
+        """Rebuild the search vector of every food in the queryset with a single UPDATE."""
+        weights = self.model.ingredients.through.objects
+        names = weights.filter(food=OuterRef('pk')).order_by().values('food').annotate(
+            names=StringAgg('ingredient__name', ' ', ordering='-ingredient_id'),
+        ).values('names')
+        ingredients_str = Coalesce(Subquery(names), Value(''))
+        return self.update(_ingredients_vector=SearchVector(
+            Concat(Value("'"), ingredients_str, Value("'"))
+        ))
+
 
 class FoodManager(models.Manager):
     def get_queryset(self):
-        return FoodQuerySet(self.model)
\ No newline at end of file
+        return FoodQuerySet(self.model)
+
+
+class JobQuerySet(models.QuerySet):
+    def ready(self):
+        return self.filter(status=self.model.PENDING, run_at__lte=timezone.now())
+
+    def stale(self, timeout):
+        return self.filter(status=self.model.RUNNING,
+                           locked_at__lt=timezone.now() - timedelta(seconds=timeout))
+
+    def stats(self):
+        """Queue depth and latency (age of the oldest ready job) per job name."""
+        now = timezone.now()
+        rows = self.order_by().values('name').annotate(
+            pending=Count('pk', filter=Q(status=self.model.PENDING)),
+            ready=Count('pk', filter=Q(status=self.model.PENDING, run_at__lte=now)),
+            running=Count('pk', filter=Q(status=self.model.RUNNING)),
+            failed=Count('pk', filter=Q(status=self.model.FAILED)),
+            oldest_ready=Min('run_at', filter=Q(status=self.model.PENDING, run_at__lte=now)),
+        )
+        stats = {}
+        for row in rows:
+            oldest_ready = row.pop('oldest_ready')
+            row['latency'] = (now - oldest_ready).total_seconds() if oldest_ready else 0
+            stats[row.pop('name')] = row
+        return stats
+
+
+class JobManager(models.Manager):
+    def get_queryset(self):
+        return JobQuerySet(self.model)
+
+
+# serializes the transactions writing changes, so sequence order is commit order
+CHANGES_LOCK_ID = 0x636861
+
+
+class ChangeManager(models.Manager):
+    def record(self, model_name, object_ids, action):
+        """Log a change of the objects, replacing their previous changes.
+
+        Called from the transaction of the write, see home/signals.py.
+        """
+        object_ids = {object_id for object_id in object_ids if object_id is not None}
+        if not object_ids:
+            return
+
+        with transaction.atomic(using=self.db):
+            connection = transaction.get_connection(self.db)
+            if connection.vendor == 'postgresql':
+                with connection.cursor() as cursor:
+                    cursor.execute('SELECT pg_advisory_xact_lock(%s)', [CHANGES_LOCK_ID])
+            self.filter(model=model_name, object_id__in=object_ids).delete()
+            self.bulk_create([
+                self.model(model=model_name, object_id=object_id, action=action)
+                for object_id in sorted(object_ids)
+            ])
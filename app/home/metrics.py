@@ -0,0 +1,21 @@
+import threading
+from collections import defaultdict
+
+_lock = threading.Lock()
+_counters = defaultdict(int)
+
+
+def increment(name, value=1):
+    with _lock:
+        _counters[name] += value
+
+
+def snapshot():
+    """Counters of this process, they are not shared between gunicorn workers."""
+    with _lock:
+        return dict(_counters)
+
+
+def reset():
+    with _lock:
+        _counters.clear()
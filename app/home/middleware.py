@@ -0,0 +1,238 @@
+import json
+import math
+import random
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.exceptions import MiddlewareNotUsed
+from django.http import HttpResponseRedirect, JsonResponse
+from django.utils import timezone
+from django.utils.cache import patch_cache_control, patch_vary_headers
+
+from rest_framework.authtoken.models import Token
+
+from home import cache, metrics
+
+TOKEN_CACHE_TIMEOUT = 60
+
+
+class TokenBucket:
+    def __init__(self, rate, burst):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.updated = time.monotonic()
+
+    def take(self):
+        """Take a token, return the seconds to wait for one if the bucket is empty."""
+        now = time.monotonic()
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return 0
+        return (1 - self.tokens) / self.rate
+
+
+class AdmissionControlMiddleware:
+    """Rate and concurrency limits per cost class of route, see ``ADMISSION_CONTROL``.
+
+    Every client (api token, or ip address for other requests) gets a token
+    bucket per cost class, requests over the quota get a 429. A cost class can
+    also limit the requests it serves at once, requests over it get a 503.
+    Limits are kept per process.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.config = settings.ADMISSION_CONTROL
+        self.classes = self.config['CLASSES']
+        self.semaphores = {
+            name: threading.BoundedSemaphore(cost_class['CONCURRENCY'])
+            for name, cost_class in self.classes.items() if cost_class.get('CONCURRENCY')
+        }
+        self.buckets = OrderedDict()
+        self.lock = threading.Lock()
+
+    def __call__(self, request):
+        try:
+            return self.get_response(request)
+        finally:
+            if semaphore := getattr(request, '_admission_semaphore', None):
+                semaphore.release()
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        if not self.config['ENABLED']:
+            return None
+
+        name = self.get_cost_class(request)
+        cost_class = self.classes[name]
+
+        if cost_class.get('RATE'):
+            retry_after = self.take_token(request, name, cost_class)
+            if retry_after:
+                metrics.increment(f'admission.{name}.throttled')
+                return self.reject(429, "Request was throttled.", retry_after)
+
+        if semaphore := self.semaphores.get(name):
+            if not semaphore.acquire(blocking=False):
+                metrics.increment(f'admission.{name}.shed')
+                return self.reject(503, "Server is busy.", 1)
+            request._admission_semaphore = semaphore
+
+        metrics.increment(f'admission.{name}.admitted')
+        return None
+
+    def get_cost_class(self, request):
+        routes = self.config['ROUTES']
+        url_name = request.resolver_match.url_name
+        for param in request.GET:
+            if f'{url_name}?{param}' in routes:
+                return routes[f'{url_name}?{param}']
+        return routes.get(url_name, self.config['DEFAULT_CLASS'])
+
+    @staticmethod
+    def is_valid_token(key):
+        if len(key) != Token._meta.get_field('key').max_length:
+            return False
+        return caches['default'].get_or_set(f'admission-token:{key}',
+                                            lambda: Token.objects.filter(key=key).exists(),
+                                            TOKEN_CACHE_TIMEOUT)
+
+    @classmethod
+    def get_client(cls, request):
+        auth = request.META.get('HTTP_AUTHORIZATION', '').split()
+        # unknown tokens would give every request a bucket of its own
+        if len(auth) == 2 and auth[0].lower() == 'token' and cls.is_valid_token(auth[1]):
+            return 'token:' + auth[1]
+        # the last address is the one added by our nginx, the others can be forged
+        forwarded_for = request.META.get('HTTP_X_FORWARDED_FOR', '').split(',')[-1].strip()
+        return 'ip:' + (forwarded_for or request.META.get('REMOTE_ADDR', ''))
+
+    def take_token(self, request, name, cost_class):
+        key = (self.get_client(request), name)
+        with self.lock:
+            # least recently seen clients are forgotten first
+            bucket = self.buckets.pop(key, None) or TokenBucket(cost_class['RATE'], cost_class['BURST'])
+            self.buckets[key] = bucket
+            if len(self.buckets) > self.config['MAX_CLIENTS']:
+                self.buckets.popitem(last=False)
+            return bucket.take()
+
+    @staticmethod
+    def reject(status, detail, retry_after):
+        response = JsonResponse({'detail': detail}, status=status)
+        response['Retry-After'] = str(math.ceil(retry_after))
+        return response
+
+
+def is_sensitive(key, fields):
+    key = str(key).lower()
+    return any(field in key for field in fields)
+
+
+def redact(data, fields):
+    """Redact the values of the keys containing any of ``fields``, ignoring case."""
+    if isinstance(data, dict):
+        return {key: '[redacted]' if is_sensitive(key, fields) else redact(value, fields)
+                for key, value in data.items()}
+    if isinstance(data, list):
+        return [redact(value, fields) for value in data]
+    return data
+
+
+class RequestLogMiddleware:
+    """Appends a sample of the requests to a JSONL file, see ``REQUEST_LOG``.
+
+    The log can be replayed with ``manage.py replay_traffic``. Credentials are
+    never logged, only the class that authenticated the request.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.config = settings.REQUEST_LOG
+        if not self.config['PATH']:
+            raise MiddlewareNotUsed
+        self.lock = threading.Lock()
+
+    def __call__(self, request):
+        if random.random() >= self.config['SAMPLE_RATE']:
+            return self.get_response(request)
+
+        body = self.get_body(request)
+        started = time.perf_counter()
+        response = self.get_response(request)
+        latency = time.perf_counter() - started
+
+        fields = self.config['REDACT_FIELDS']
+        self.write({
+            'time': timezone.now().isoformat(),
+            'method': request.method,
+            'path': request.path,
+            'query': redact({key: request.GET.getlist(key) for key in request.GET}, fields),
+            'body': redact(body, fields),
+            'auth': self.get_authenticator(request, response),
+            'status': response.status_code,
+            'latency_ms': round(latency * 1000, 3),
+        })
+        return response
+
+    def get_body(self, request):
+        length = int(request.META.get('CONTENT_LENGTH') or 0)
+        if not length or length > self.config['MAX_BODY_SIZE']:
+            return None
+        # form bodies are not logged, parsing them here would consume the stream
+        if request.content_type != 'application/json':
+            return None
+        try:
+            return json.loads(request.body)
+        except ValueError:
+            return None
+
+    @staticmethod
+    def get_authenticator(request, response):
+        drf_request = getattr(response, 'renderer_context', {}).get('request')
+        authenticator = getattr(drf_request, 'successful_authenticator', None)
+        if authenticator is not None:
+            return authenticator.__class__.__name__
+        return None
+
+    def write(self, entry):
+        line = json.dumps(entry, default=str) + '\n'
+        with self.lock, open(self.config['PATH'], 'a') as f:
+            f.write(line)
+
+
+class AnonymousCacheMiddleware:
+    """Lets nginx cache anonymous reads of the routes in ``HTTP_CACHE``.
+
+    Query strings with unsorted parameters are redirected to the sorted order
+    first, so the order of the parameters doesn't multiply the entries kept by
+    nginx. Other encodings of the same values are served as they are. The
+    redirects are temporary,
+    as browsers keep permanent ones for good, and run before admission control
+    so they don't use up the quota of the client.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        if cache.is_cacheable(request) and response.status_code in (200, 302):
+            patch_cache_control(response, public=True, max_age=settings.HTTP_CACHE['MAX_AGE'])
+            patch_vary_headers(response, ['Accept', 'Authorization', 'Cookie'])
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        if not cache.is_cacheable(request):
+            return None
+
+        if not cache.is_canonical(request.META.get('QUERY_STRING', '')):
+            query_string = cache.canonical_query_string(request.GET)
+            return HttpResponseRedirect(f'{request.path}?{query_string}' if query_string
+                                        else request.path)
+        return None
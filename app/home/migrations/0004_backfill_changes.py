@@ -0,0 +1,27 @@
+from django.db import migrations
+
+BATCH_SIZE = 1000
+
+
+def backfill_changes(apps, schema_editor):
+    """Record an upsert of every existing object, so that syncing from ``since=0`` sees all of them."""
+    Change = apps.get_model('home', 'Change')
+    for model_name in ('ingredient', 'food', 'ingredientweight'):
+        model = apps.get_model('home', model_name)
+        recorded = Change.objects.filter(model=model_name).values('object_id')
+        pks = model.objects.exclude(pk__in=recorded).order_by('pk').values_list('pk', flat=True)
+        Change.objects.bulk_create(
+            (Change(model=model_name, object_id=pk, action='upsert') for pk in pks.iterator()),
+            batch_size=BATCH_SIZE,
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('home', '0003_change'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_changes, migrations.RunPython.noop),
+    ]
@@ -1,5 +1,7 @@
 from django.db import models
+from django.db.models import Q
 from django.db.models.expressions import Value
+from django.utils import timezone
 
 from django.contrib.postgres.indexes import GinIndex
 from django.contrib.postgres.search import SearchVectorField, SearchVector
@@ -7,7 +9,30 @@ from django.contrib.postgres.search import SearchVectorField, SearchVector
 from home import managers
 
 
-class Ingredient(models.Model):
+class LoadedValuesMixin:
+    """Remembers field values as loaded from the database, see signals."""
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_values = dict(zip(field_names, values))
+        return instance
+
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        # the post_save receivers have compared with the old values, the next save compares with these
+        update_fields = kwargs.get('update_fields')
+        self._loaded_values = {
+            **getattr(self, '_loaded_values', {}),
+            **{field.attname: getattr(self, field.attname) for field in self._meta.concrete_fields
+               if update_fields is None or field.name in update_fields},
+        }
+
+    def get_loaded_value(self, field_name, default=None):
+        return getattr(self, '_loaded_values', {}).get(field_name, default)
+
+
+class Ingredient(LoadedValuesMixin, models.Model):
     name = models.CharField(max_length=50, unique=True)
     calories = models.FloatField()
 
@@ -40,10 +65,74 @@ class Food(models.Model):
         ]
 
 
-class IngredientWeight(models.Model):
+class IngredientWeight(LoadedValuesMixin, models.Model):
     food = models.ForeignKey(Food, on_delete=models.CASCADE)
     ingredient = models.ForeignKey(Ingredient, on_delete=models.CASCADE)
     weight = models.FloatField(default=0)
 
     class Meta:
         ordering = ['-id']
+
+
+class Job(models.Model):
+    """Background job stored in the database, see home/jobs.py."""
+    PENDING = 'pending'
+    RUNNING = 'running'
+    FAILED = 'failed'
+    STATUS_CHOICES = [
+        (PENDING, 'Pending'),
+        (RUNNING, 'Running'),
+        (FAILED, 'Failed'),
+    ]
+
+    name = models.CharField(max_length=100)
+    key = models.CharField(max_length=40)
+    kwargs = models.JSONField(default=dict)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=PENDING)
+    attempts = models.PositiveIntegerField(default=0)
+    max_attempts = models.PositiveIntegerField(default=5)
+    run_at = models.DateTimeField(default=timezone.now)
+    locked_at = models.DateTimeField(null=True, blank=True)
+    last_error = models.TextField(blank=True)
+
+    objects = managers.JobManager()
+
+    def __str__(self):
+        return f"{self.name}({self.kwargs})"
+
+    class Meta:
+        ordering = ['run_at', 'id']
+        indexes = [
+            models.Index(fields=['status', 'run_at']),
+        ]
+        constraints = [
+            # identical jobs waiting to run are deduplicated on insert
+            models.UniqueConstraint(fields=['name', 'key'], condition=Q(status='pending'),
+                                    name='home_job_unique_pending'),
+        ]
+
+
+class Change(models.Model):
+    """Entry of the change feed, the latest change of every catalog object."""
+    UPSERT = 'upsert'
+    DELETE = 'delete'
+    ACTION_CHOICES = [
+        (UPSERT, 'Upsert'),
+        (DELETE, 'Delete'),
+    ]
+
+    seq = models.BigAutoField(primary_key=True)
+    model = models.CharField(max_length=50)
+    object_id = models.BigIntegerField()
+    action = models.CharField(max_length=10, choices=ACTION_CHOICES)
+
+    objects = managers.ChangeManager()
+
+    def __str__(self):
+        return f"{self.seq}: {self.action} {self.model} {self.object_id}"
+
+    class Meta:
+        ordering = ['seq']
+        indexes = [
+            models.Index(fields=['model', 'object_id']),
+        ]
@@ -18,6 +18,14 @@ class PermissionsMixin:
         obj = serializer.save()
         self._assign_object_perms(obj)
 
+    @transaction.atomic
+    def perform_update(self, serializer):
+        serializer.save()
+
+    @transaction.atomic
+    def perform_destroy(self, instance):
+        instance.delete()
+
     def _assign_object_perms(self, object):
         user = self.request.user
         name = object.__class__.__name__.lower()
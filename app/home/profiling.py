@@ -0,0 +1,66 @@
+import time
+from contextlib import contextmanager
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from home.models import Food
+
+
+@contextmanager
+def _stage(stages, name):
+    started = time.perf_counter()
+    with CaptureQueriesContext(connection) as queries:
+        yield
+    stages[name] = {
+        'time_ms': (time.perf_counter() - started) * 1000,
+        'queries': len(queries),
+        'sql': [query['sql'] for query in queries],
+    }
+
+
+def _sql(queryset):
+    sql, params = queryset.query.sql_with_params()
+    with connection.cursor() as cursor:
+        return cursor.mogrify(sql, params).decode()
+
+
+def profile_search(view):
+    """Run the list action of a ``FoodViewSet`` stage by stage and explain its page query.
+
+    The view must be set up with a request, like it is in an action.
+    """
+    stages = {}
+
+    with _stage(stages, 'filter'):
+        queryset = view.filter_queryset(view.get_queryset())
+
+    with _stage(stages, 'pagination'):
+        page = view.paginate_queryset(queryset)
+
+    with _stage(stages, 'serialization'):
+        if page is not None:
+            view.get_paginated_response(view.get_serializer(page, many=True).data)
+        else:
+            view.get_serializer(queryset, many=True).data
+
+    # the query of the page, with its LIMIT and OFFSET, is the one the list action runs
+    page_queryset = queryset
+    if page is not None:
+        page_size = view.paginator.page.paginator.per_page
+        offset = (view.paginator.page.number - 1) * page_size
+        page_queryset = queryset[offset:offset + page_size]
+    sql = _sql(page_queryset)
+    plan = page_queryset.explain(analyze=True, buffers=True)
+
+    return {
+        'ingredients': view.request.GET.getlist('ingredient'),
+        'sql': sql,
+        'plan': plan,
+        'indexes': {index.name: index.name in plan for index in Food._meta.indexes},
+        'stages': stages,
+        'total': {
+            'time_ms': sum(stage['time_ms'] for stage in stages.values()),
+            'queries': sum(stage['queries'] for stage in stages.values()),
+        },
+    }
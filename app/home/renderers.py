@@ -0,0 +1,34 @@
+import msgpack
+import orjson
+
+from rest_framework.renderers import BaseRenderer, JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+# handles the types orjson and msgpack do not know (Decimal, lazy strings, ...)
+_encoder = JSONEncoder()
+
+
+class ORJSONRenderer(JSONRenderer):
+    """Same output as ``JSONRenderer``, rendered by orjson."""
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+
+        option = 0
+        if self.get_indent(accepted_media_type, renderer_context or {}):
+            option |= orjson.OPT_INDENT_2
+        return orjson.dumps(data, default=_encoder.default, option=option)
+
+
+class MessagePackRenderer(BaseRenderer):
+    media_type = 'application/msgpack'
+    format = 'msgpack'
+    charset = None
+    render_style = 'binary'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+
+        return msgpack.packb(data, default=_encoder.default)
@@ -0,0 +1,141 @@
+import json
+import math
+import threading
+import time
+import urllib.error
+import urllib.request
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlencode
+
+from django.urls import Resolver404, resolve
+
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+
+def load(path, methods=None):
+    """Read the entries written by ``RequestLogMiddleware``."""
+    with open(path) as f:
+        entries = [json.loads(line) for line in f if line.strip()]
+    if methods:
+        entries = [entry for entry in entries if entry['method'] in methods]
+    return entries
+
+
+def route_name(path):
+    try:
+        return resolve(path).url_name or path
+    except Resolver404:
+        return path
+
+
+def _url(entry):
+    query = urlencode(entry.get('query') or {}, doseq=True)
+    return f"{entry['path']}?{query}" if query else entry['path']
+
+
+def _body(entry):
+    return json.dumps(entry['body']).encode() if entry.get('body') is not None else b''
+
+
+class InProcessClient:
+    """Sends the requests straight to the views, without the middleware."""
+
+    def __init__(self, user=None):
+        self.factory = APIRequestFactory()
+        self.user = user
+
+    def __call__(self, entry):
+        request = self.factory.generic(entry['method'], _url(entry), _body(entry),
+                                       content_type='application/json')
+        if self.user is not None:
+            force_authenticate(request, user=self.user)
+        match = request.resolver_match = resolve(entry['path'])
+        response = match.func(request, *match.args, **match.kwargs)
+        if hasattr(response, 'render'):
+            response.render()
+        return response.status_code
+
+
+class HttpClient:
+    def __init__(self, target, token=None, timeout=30):
+        self.target = target.rstrip('/')
+        self.headers = {'Content-Type': 'application/json', 'Accept': 'application/json'}
+        if token:
+            self.headers['Authorization'] = f'Token {token}'
+        self.timeout = timeout
+
+    def __call__(self, entry):
+        request = urllib.request.Request(self.target + _url(entry), data=_body(entry) or None,
+                                         headers=self.headers, method=entry['method'])
+        try:
+            with urllib.request.urlopen(request, timeout=self.timeout) as response:
+                response.read()
+                return response.status
+        except urllib.error.HTTPError as e:
+            return e.code
+
+
+def replay(entries, client, concurrency=1, rate=None):
+    """Send the entries with ``client``, at most ``rate`` requests per second.
+
+    Returns a ``(route, status, latency)`` tuple per entry, the status is None
+    when the request raised.
+    """
+    results = []
+    lock = threading.Lock()
+    started = time.perf_counter()
+
+    def send(i, entry):
+        if rate:
+            delay = started + i / rate - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+        request_started = time.perf_counter()
+        try:
+            status = client(entry)
+        except Exception:
+            status = None
+        result = (route_name(entry['path']), status, time.perf_counter() - request_started)
+        with lock:
+            results.append(result)
+
+    if concurrency == 1:
+        for i, entry in enumerate(entries):
+            send(i, entry)
+        return results
+
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        for i, entry in enumerate(entries):
+            executor.submit(send, i, entry)
+
+    return results
+
+
+def percentile(values, percent):
+    """Nearest-rank percentile."""
+    values = sorted(values)
+    index = max(0, min(len(values) - 1, math.ceil(percent / 100 * len(values)) - 1))
+    return values[index]
+
+
+def summarize(results):
+    """Latency percentiles (ms) and error rates per route."""
+    routes = defaultdict(list)
+    for route, status, latency in results:
+        routes[route].append((status, latency))
+
+    summary = {}
+    for route, route_results in sorted(routes.items()):
+        latencies = [latency * 1000 for _, latency in route_results]
+        statuses = [status for status, _ in route_results]
+        summary[route] = {
+            'requests': len(route_results),
+            'p50': percentile(latencies, 50),
+            'p90': percentile(latencies, 90),
+            'p99': percentile(latencies, 99),
+            'max': max(latencies),
+            'client_errors': sum(1 for s in statuses if s is not None and 400 <= s < 500) / len(statuses),
+            'errors': sum(1 for s in statuses if s is None or s >= 500) / len(statuses),
+        }
+    return summary
@@ -1,13 +1,87 @@
-from rest_framework import serializers
+from rest_framework import permissions, serializers
 
+from .fields import CachedHyperlinkedIdentityField, CachedHyperlinkedRelatedField
 from .models import (
     Food,
     Ingredient,
     IngredientWeight,
 )
 
+TRUE_VALUES = ('1', 'true', 'yes')
 
-class FoodSerializer(serializers.HyperlinkedModelSerializer):
+
+def _split(param):
+    return {name.strip() for name in param.split(',') if name.strip()} if param else set()
+
+
+class SparseFieldsMixin:
+    """Applies the ``fields``, ``omit`` and ``compact`` query parameters of the request.
+
+    ``?fields=id,name`` and ``?omit=description`` select the fields of the
+    top-level objects of reads, writes always validate every field.
+    ``?compact=1`` replaces hyperlinks with primary keys, for nested objects too.
+    """
+
+    def get_fields(self):
+        fields = super().get_fields()
+        request = self.context.get('request')
+        if request is None:
+            return fields
+
+        params = request.query_params
+        if params.get('compact', '').lower() in TRUE_VALUES:
+            fields = self._compact_fields(fields)
+
+        if request.method in permissions.SAFE_METHODS and self._is_top_level():
+            if only := _split(params.get('fields')):
+                fields = {name: field for name, field in fields.items() if name in only}
+            for name in _split(params.get('omit')):
+                fields.pop(name, None)
+
+        return fields
+
+    def _is_top_level(self):
+        parent = self.parent
+        return parent is None or (isinstance(parent, serializers.ListSerializer) and parent.parent is None)
+
+    @staticmethod
+    def _compact_fields(fields):
+        compact = {}
+        for name, field in fields.items():
+            if isinstance(field, serializers.HyperlinkedIdentityField):
+                if 'id' not in fields:
+                    compact['id'] = serializers.ReadOnlyField(source='pk')
+                continue
+            if isinstance(field, serializers.HyperlinkedRelatedField):
+                field = serializers.PrimaryKeyRelatedField(
+                    queryset=field.queryset,
+                    read_only=field.read_only,
+                    required=field.required,
+                    allow_null=field.allow_null,
+                )
+            compact[name] = field
+        return compact
+
+
+class BaseHyperlinkedModelSerializer(SparseFieldsMixin, serializers.HyperlinkedModelSerializer):
+    """Base of the serializers below, hyperlinks are built by home.fields."""
+    serializer_related_field = CachedHyperlinkedRelatedField
+    serializer_url_field = CachedHyperlinkedIdentityField
+
+    def build_nested_field(self, field_name, relation_info, nested_depth):
+        class NestedSerializer(BaseHyperlinkedModelSerializer):
+            class Meta:
+                model = relation_info.related_model
+                depth = nested_depth - 1
+                fields = '__all__'
+
+        field_class = NestedSerializer
+        field_kwargs = serializers.get_nested_relation_kwargs(relation_info)
+
+        return field_class, field_kwargs
+
+
+class FoodSerializer(BaseHyperlinkedModelSerializer):
     class Meta:
         model = Food
         depth = 1
@@ -19,7 +93,9 @@ class FoodRecommendationSerializer(FoodSerializer):
 
     def get_ingredients(self, food):
         ingredients = self.context['request'].GET.getlist('ingredient')
-        data = IngredientSerializer(food.ingredients, many=True).data
+        serializer = IngredientSerializer(many=True)
+        serializer.bind('ingredients', self)
+        data = serializer.to_representation(food.ingredients.all())
         for i in data:
             if i['name'] in ingredients:
                 i['absent'] = False
@@ -29,13 +105,13 @@ class FoodRecommendationSerializer(FoodSerializer):
         return data
 
 
-class IngredientSerializer(serializers.HyperlinkedModelSerializer):
+class IngredientSerializer(BaseHyperlinkedModelSerializer):
     class Meta:
         model = Ingredient
         fields = ['id', 'name', 'calories', 'url']
 
 
-class IngredientWeightSerializer(serializers.HyperlinkedModelSerializer):
+class IngredientWeightSerializer(BaseHyperlinkedModelSerializer):
     class Meta:
         model = IngredientWeight
         fields = ['id', 'food', 'ingredient', 'weight', 'url']
@@ -1,9 +1,181 @@
-from django.db.models.signals import post_save
+import threading
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models.signals import m2m_changed, post_delete, post_save
 from django.dispatch import receiver
-from home.models import IngredientWeight
+from django.urls import reverse
+from home import jobs
+from home.models import Change, Food, Ingredient, IngredientWeight
+
+_dirty = threading.local()
+
+
+def _pending(name):
+    if not hasattr(_dirty, name):
+        setattr(_dirty, name, set())
+    return getattr(_dirty, name)
+
+
+def _take_pending(name):
+    pending = _pending(name)
+    setattr(_dirty, name, set())
+    return pending
+
+
+def mark_food_vectors_dirty(food_ids):
+    """Schedule a search vector rebuild of the foods once the transaction commits.
+
+    Every call registers a callback, but the first one to run takes the whole
+    set, so a transaction touching many ingredients rebuilds each food once.
+    Ids left behind by a rolled back transaction are rebuilt with the next
+    batch, which is harmless.
+    """
+    food_ids = {food_id for food_id in food_ids if food_id is not None}
+    if not food_ids:
+        return
+
+    _pending('food_ids').update(food_ids)
+    transaction.on_commit(update_dirty_food_vectors)
+
+
+def update_dirty_food_vectors():
+    if food_ids := _take_pending('food_ids'):
+        jobs.enqueue('update_food_vectors', food_ids=sorted(food_ids))
+
+
+@jobs.register('update_food_vectors')
+def update_food_vectors(food_ids):
+    Food.objects.filter(pk__in=food_ids).update_vectors()
+
+
+def http_cache_refresh_enabled():
+    # inline jobs would call nginx from the write request, once per host, Accept and path
+    return bool(settings.HTTP_CACHE['REFRESH_URL']) and bool(settings.JOBS_ASYNC)
+
+
+def mark_http_cache_stale(paths):
+    """Schedule a refresh of the paths cached by nginx once the transaction commits."""
+    _pending('paths').update(paths)
+    transaction.on_commit(refresh_stale_http_cache)
+
+
+def refresh_stale_http_cache():
+    if paths := _take_pending('paths'):
+        jobs.enqueue('refresh_http_cache', paths=sorted(paths))
+
+
+def _paths(basename, pks):
+    return {reverse(f'{basename}-list')} | {
+        reverse(f'{basename}-detail', kwargs={'pk': pk}) for pk in pks if pk is not None
+    }
+
+
+def mark_foods_changed(food_ids):
+    if http_cache_refresh_enabled():
+        mark_http_cache_stale(_paths('food', food_ids))
+
+
+@receiver(post_save, sender=Food)
+@receiver(post_delete, sender=Food)
+def on_food_change(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+
+    mark_foods_changed({instance.pk})
 
 
 @receiver(post_save, sender=IngredientWeight)
-def on_ingredient_weight_save(sender, instance, **kwargs):
-    instance.food._update_vector()
-    instance.food.save()
+def on_ingredient_weight_save(sender, instance, raw, **kwargs):
+    if raw:
+        return
+
+    food_ids = {instance.food_id, instance.get_loaded_value('food_id')}
+    mark_food_vectors_dirty(food_ids)
+    mark_foods_changed(food_ids)
+
+
+@receiver(post_delete, sender=IngredientWeight)
+def on_ingredient_weight_delete(sender, instance, **kwargs):
+    mark_food_vectors_dirty({instance.food_id})
+    mark_foods_changed({instance.food_id})
+
+
+@receiver(post_save, sender=Ingredient)
+def on_ingredient_save(sender, instance, created, raw, **kwargs):
+    if raw:
+        return
+
+    if http_cache_refresh_enabled():
+        mark_http_cache_stale(_paths('ingredient', {instance.pk}))
+        if not created:
+            mark_foods_changed(instance.food_set.values_list('pk', flat=True))
+
+    if created or instance.get_loaded_value('name') == instance.name:
+        return
+
+    mark_food_vectors_dirty(instance.food_set.values_list('pk', flat=True))
+
+
+@receiver(post_delete, sender=Ingredient)
+def on_ingredient_delete(sender, instance, **kwargs):
+    # foods are refreshed by the deletes of the ingredient weights
+    if http_cache_refresh_enabled():
+        mark_http_cache_stale(_paths('ingredient', {instance.pk}))
+
+
+@receiver(m2m_changed, sender=IngredientWeight)
+def on_food_ingredients_change(sender, instance, action, reverse, pk_set, **kwargs):
+    if action not in ('post_add', 'post_remove', 'pre_clear'):
+        return
+
+    if not reverse:
+        food_ids = {instance.pk}
+    elif action == 'pre_clear':
+        food_ids = set(instance.food_set.values_list('pk', flat=True))
+    else:
+        food_ids = pk_set
+    mark_food_vectors_dirty(food_ids)
+    mark_foods_changed(food_ids)
+
+
+@receiver(post_save, sender=Food)
+@receiver(post_save, sender=Ingredient)
+@receiver(post_save, sender=IngredientWeight)
+def record_save(sender, instance, **kwargs):
+    Change.objects.record(sender._meta.model_name, {instance.pk}, Change.UPSERT)
+
+
+@receiver(post_delete, sender=Food)
+@receiver(post_delete, sender=Ingredient)
+@receiver(post_delete, sender=IngredientWeight)
+def record_delete(sender, instance, **kwargs):
+    Change.objects.record(sender._meta.model_name, {instance.pk}, Change.DELETE)
+
+
+@receiver(post_save, sender=IngredientWeight)
+@receiver(post_delete, sender=IngredientWeight)
+def record_ingredient_weight_foods(sender, instance, **kwargs):
+    # foods are served with their ingredients
+    Change.objects.record(Food._meta.model_name,
+                          {instance.food_id, instance.get_loaded_value('food_id')}, Change.UPSERT)
+
+
+@receiver(post_save, sender=Ingredient)
+def record_ingredient_foods(sender, instance, created, **kwargs):
+    if not created:
+        Change.objects.record(Food._meta.model_name, instance.food_set.values_list('pk', flat=True),
+                              Change.UPSERT)
+
+
+@receiver(m2m_changed, sender=IngredientWeight)
+def record_food_ingredients_change(sender, instance, action, reverse, model, pk_set, **kwargs):
+    # add() bulk creates the ingredient weights, remove() and clear() send post_delete for them
+    if action != 'post_add':
+        return
+
+    weights = IngredientWeight.objects.filter(**{'ingredient' if reverse else 'food': instance})
+    weights = weights.filter(**{'food__in' if reverse else 'ingredient__in': pk_set})
+    Change.objects.record(IngredientWeight._meta.model_name, weights.values_list('pk', flat=True),
+                          Change.UPSERT)
+    Change.objects.record(Food._meta.model_name, pk_set if reverse else {instance.pk}, Change.UPSERT)
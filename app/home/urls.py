@@ -3,9 +3,11 @@ from django.urls import include, path, re_path
 from rest_framework.routers import DefaultRouter
 
 from .views import (
+    ChangesView,
     FoodViewSet,
     IngredientViewSet,
     IngredientWeightViewSet,
+    MetricsView,
 )
 
 router = DefaultRouter()
@@ -15,4 +17,6 @@ router.register(r'ingredient_weights', IngredientWeightViewSet)
 
 urlpatterns = [
     path(r'', include(router.urls)),
+    path('changes/', ChangesView.as_view(), name='changes'),
+    path('metrics/', MetricsView.as_view(), name='metrics'),
 ]
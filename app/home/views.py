@@ -1,10 +1,18 @@
+from rest_framework import status
+from rest_framework.decorators import action
+from rest_framework.permissions import AllowAny, IsAdminUser
+from rest_framework.response import Response
+from rest_framework.views import APIView
 from rest_framework.viewsets import ModelViewSet
 
+from . import metrics, profiling
 from .permissions import PermissionsMixin
 from .models import (
+    Change,
     Food,
     Ingredient,
-    IngredientWeight
+    IngredientWeight,
+    Job,
 )
 from .serializers import (
     FoodSerializer,
@@ -15,7 +23,7 @@ from .serializers import (
 
 
 class FoodViewSet(PermissionsMixin, ModelViewSet):
-    queryset = Food.objects.all()
+    queryset = Food.objects.prefetch_related('ingredients')
     serializer_class = FoodSerializer
 
     def filter_queryset(self, queryset):
@@ -27,6 +35,15 @@ class FoodViewSet(PermissionsMixin, ModelViewSet):
 
         return queryset
 
+    @action(detail=False, url_path='search/profile', url_name='search-profile',
+            permission_classes=[IsAdminUser])
+    def profile_search(self, request):
+        if not request.GET.getlist('ingredient'):
+            return Response({'ingredient': ["This query parameter is required."]},
+                            status=status.HTTP_400_BAD_REQUEST)
+
+        return Response(profiling.profile_search(self))
+
 
 class IngredientViewSet(PermissionsMixin, ModelViewSet):
     queryset = Ingredient.objects.all()
@@ -36,3 +53,73 @@ class IngredientViewSet(PermissionsMixin, ModelViewSet):
 class IngredientWeightViewSet(PermissionsMixin, ModelViewSet):
     queryset = IngredientWeight.objects.all()
     serializer_class = IngredientWeightSerializer
+
+
+class MetricsView(APIView):
+    permission_classes = [IsAdminUser]
+
+    def get(self, request):
+        return Response({
+            'counters': metrics.snapshot(),
+            'jobs': Job.objects.all().stats(),
+        })
+
+
+class ChangesView(APIView):
+    """Changes of the catalog after ``since``, in sequence order and ``limit`` at a time.
+
+    Every object appears once, with its latest change. Upserts carry the
+    current representation of the object, deletes only its id. Clients keep
+    the ``last_seq`` of a batch and ask for the next one until ``has_more``
+    is false.
+    """
+    permission_classes = [AllowAny]
+    default_limit = 100
+    max_limit = 1000
+    models = {
+        'food': (Food.objects.prefetch_related('ingredients'), FoodSerializer),
+        'ingredient': (Ingredient.objects.all(), IngredientSerializer),
+        'ingredientweight': (IngredientWeight.objects.all(), IngredientWeightSerializer),
+    }
+
+    def get(self, request):
+        try:
+            since = int(request.GET.get('since', 0))
+            limit = min(int(request.GET.get('limit', self.default_limit)), self.max_limit)
+        except ValueError:
+            return Response({'detail': "since and limit must be integers."},
+                            status=status.HTTP_400_BAD_REQUEST)
+        if since < 0 or limit < 1:
+            return Response({'detail': "since must be at least 0 and limit at least 1."},
+                            status=status.HTTP_400_BAD_REQUEST)
+
+        changes = list(Change.objects.filter(seq__gt=since)[:limit + 1])
+        has_more = len(changes) > limit
+        changes = changes[:limit]
+
+        return Response({
+            'results': self.serialize(changes),
+            'last_seq': changes[-1].seq if changes else since,
+            'has_more': has_more,
+        })
+
+    def serialize(self, changes):
+        upserts = {}
+        for change in changes:
+            if change.action == Change.UPSERT:
+                upserts.setdefault(change.model, set()).add(change.object_id)
+
+        data = {}
+        context = {'request': self.request}
+        for model_name, ids in upserts.items():
+            queryset, serializer_class = self.models[model_name]
+            for obj in queryset.filter(pk__in=ids):
+                data[model_name, obj.pk] = serializer_class(obj, context=context).data
+
+        return [{
+            'seq': change.seq,
+            'model': change.model,
+            'id': change.object_id,
+            'action': change.action,
+            'data': data.get((change.model, change.object_id)),
+        } for change in changes]
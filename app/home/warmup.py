@@ -0,0 +1,75 @@
+import logging
+import time
+
+from django.apps import apps
+from django.conf import settings
+from django.db import connections
+from django.urls import get_resolver
+from django.utils import translation
+
+from rest_framework.settings import api_settings
+
+logger = logging.getLogger(__name__)
+
+
+def _warm_urls():
+    resolver = get_resolver()
+    # accessing the reverse dict populates the resolver and compiles patterns
+    return len(resolver.reverse_dict)
+
+
+def _warm_models():
+    return sum(len(model._meta.get_fields()) for model in apps.get_models())
+
+
+def _warm_rest_framework():
+    classes = []
+    for setting in api_settings.import_strings:
+        value = getattr(api_settings, setting)
+        classes.extend(value if isinstance(value, (list, tuple)) else [value])
+    return len(classes)
+
+
+def _warm_url_templates():
+    from home.fields import get_url_template
+
+    # serializer fields are rebuilt for every instance, the url templates of the hyperlinks persist
+    names = [name for name in get_resolver().reverse_dict
+             if isinstance(name, str) and name.endswith('-detail')]
+    for name in names:
+        get_url_template(name, 'pk')
+    return len(names)
+
+
+def _warm_translations():
+    translation.activate(settings.LANGUAGE_CODE)
+    translation.gettext('')
+    translation.deactivate()
+
+
+STAGES = [
+    ('urls', _warm_urls),
+    ('models', _warm_models),
+    ('rest_framework', _warm_rest_framework),
+    ('url_templates', _warm_url_templates),
+    ('translations', _warm_translations),
+]
+
+
+def warm_up():
+    """Populate process-wide caches so preforked workers share them copy-on-write."""
+    timings = {}
+    for name, stage in STAGES:
+        started = time.perf_counter()
+        stage()
+        timings[name] = time.perf_counter() - started
+
+    # connections must never be shared between forked workers
+    connections.close_all()
+    return timings
+
+
+def log_startup_report(timings):
+    total = sum(timings.values())
+    stages = ", ".join(f"{name}={seconds * 1000:.1f}ms" for name, seconds in timings.items())
+    logger.info("startup took %.1fms (%s)", total * 1000, stages)
@@ -29,6 +29,10 @@ DEBUG = int(os.environ.get("DEBUG", default=0))
 
 ALLOWED_HOSTS = os.environ.get("DJANGO_ALLOWED_HOSTS").split(" ")
 
+# Populate url, url template and translation caches when the WSGI application is
+# loaded, see home/warmup.py
+WARM_UP_ON_STARTUP = int(os.environ.get("WARM_UP_ON_STARTUP", default=1))
+
 
 # Application definition
 
@@ -46,7 +50,10 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'home.middleware.RequestLogMiddleware',
     'django.middleware.security.SecurityMiddleware',
+    'home.middleware.AnonymousCacheMiddleware',
+    'home.middleware.AdmissionControlMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -114,7 +121,12 @@ AUTH_PASSWORD_VALIDATORS = [
 
 REST_FRAMEWORK = {
     'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
-    'PAGE_SIZE': 10
+    'PAGE_SIZE': 10,
+    'DEFAULT_RENDERER_CLASSES': [
+        'home.renderers.ORJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+        'home.renderers.MessagePackRenderer',
+    ],
 }
 
 AUTHENTICATION_BACKENDS = (
@@ -123,6 +135,78 @@ AUTHENTICATION_BACKENDS = (
 )
 
 
+# Background jobs, see home/jobs.py. Unless JOBS_ASYNC is set, jobs are run
+# as soon as they are enqueued and no worker is needed.
+
+JOBS_ASYNC = int(os.environ.get("JOBS_ASYNC", default=0))
+JOBS_MAX_ATTEMPTS = 5
+JOBS_RETRY_BACKOFF = 2  # seconds, doubled on every attempt
+JOBS_RETRY_BACKOFF_MAX = 300
+JOBS_STALE_TIMEOUT = 600
+
+
+# Admission control, see home/middleware.py. RATE is in requests per second
+# per client, CONCURRENCY is per process. ROUTES map url names to cost
+# classes, "name?param" when the query parameter makes the request expensive.
+
+ADMISSION_CONTROL = {
+    'ENABLED': int(os.environ.get("ADMISSION_CONTROL", default=1)),
+    'CLASSES': {
+        'cheap': {},
+        'expensive': {'RATE': 2, 'BURST': 20, 'CONCURRENCY': 4},
+    },
+    'ROUTES': {
+        'food-list?ingredient': 'expensive',
+        'food-search-profile': 'expensive',
+    },
+    'DEFAULT_CLASS': 'cheap',
+    'MAX_CLIENTS': 10000,
+}
+
+
+# Sampled request log for replay_traffic, see home/middleware.py. Values of
+# the keys containing any of REDACT_FIELDS (ignoring case) are not logged.
+
+REQUEST_LOG = {
+    'PATH': os.environ.get("REQUEST_LOG_PATH"),
+    'SAMPLE_RATE': float(os.environ.get("REQUEST_LOG_SAMPLE_RATE", default=0.01)),
+    'REDACT_FIELDS': ['password', 'token', 'secret'],
+    'MAX_BODY_SIZE': 10000,
+}
+
+
+# Anonymous reads of ROUTES are cached by nginx for MAX_AGE seconds, see
+# home/cache.py. When REFRESH_URL (nginx) is set and JOBS_ASYNC too, writes
+# refresh the cached lists and details for every host in REFRESH_HOSTS,
+# searches just expire. Without workers the cache only expires.
+
+HTTP_CACHE = {
+    'MAX_AGE': int(os.environ.get("HTTP_CACHE_MAX_AGE", default=10)),
+    'ROUTES': ['food-list', 'food-detail', 'ingredient-list', 'ingredient-detail'],
+    'REFRESH_URL': os.environ.get("HTTP_CACHE_REFRESH_URL"),
+    'REFRESH_HOSTS': os.environ.get("HTTP_CACHE_REFRESH_HOSTS", " ".join(ALLOWED_HOSTS)).split(" "),
+    'REFRESH_ACCEPT': ['application/json', 'application/msgpack'],
+    'REFRESH_TIMEOUT': 5,
+}
+
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {
+            'class': 'logging.StreamHandler',
+        },
+    },
+    'loggers': {
+        'home': {
+            'handlers': ['console'],
+            'level': os.environ.get("HOME_LOG_LEVEL", "INFO"),
+        },
+    },
+}
+
+
 # Internationalization
 # https://docs.djangoproject.com/en/3.2/topics/i18n/
 
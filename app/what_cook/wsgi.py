@@ -8,9 +8,20 @@ https://docs.djangoproject.com/en/3.2/howto/deployment/wsgi/
 """
 
 import os
+import time
 
+started = time.perf_counter()
+
+from django.conf import settings
 from django.core.wsgi import get_wsgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'what_cook.settings')
 
 application = get_wsgi_application()
+
+if settings.WARM_UP_ON_STARTUP:
+    from home.warmup import log_startup_report, warm_up
+
+    timings = {'django': time.perf_counter() - started}
+    timings.update(warm_up())
+    log_startup_report(timings)
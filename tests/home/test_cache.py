@@ -0,0 +1,147 @@
+from unittest import mock
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.test import TestCase, override_settings
+
+from rest_framework import status
+
+from home import cache
+from home.models import Food, Ingredient, IngredientWeight, Job
+
+HTTP_CACHE = {
+    'MAX_AGE': 10,
+    'ROUTES': ['food-list', 'food-detail', 'ingredient-list', 'ingredient-detail'],
+    'REFRESH_URL': None,
+    'REFRESH_HOSTS': ['localhost'],
+    'REFRESH_ACCEPT': ['application/json'],
+    'REFRESH_TIMEOUT': 5,
+}
+
+
+@override_settings(HTTP_CACHE=HTTP_CACHE)
+class AnonymousCacheMiddlewareTestCase(TestCase):
+    fixtures = ['data.json']
+
+    def assertCached(self, response):
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response['Cache-Control'], 'public, max-age=10')
+        self.assertEqual(set(response['Vary'].split(', ')), {'Accept', 'Authorization', 'Cookie'})
+
+    def assertNotCached(self, response):
+        self.assertNotIn('public', response.get('Cache-Control', ''))
+
+    def test_anonymous(self):
+        self.assertCached(self.client.get('/foods/'))
+        self.assertCached(self.client.get('/foods/1/'))
+        self.assertCached(self.client.get('/ingredients/'))
+        self.assertCached(self.client.get('/foods/?ingredient=bacon&ingredient=egg'))
+
+    def test_not_cached_route(self):
+        self.assertNotCached(self.client.get('/ingredient_weights/'))
+
+    def test_authenticated(self):
+        self.client.force_login(User.objects.get(username='what_cook'))
+
+        self.assertNotCached(self.client.get('/foods/'))
+        self.assertNotCached(self.client.get('/foods/', HTTP_AUTHORIZATION='Token abc'))
+
+    def test_not_found(self):
+        self.assertNotCached(self.client.get('/foods/0/'))
+
+    @override_settings(HTTP_CACHE={**HTTP_CACHE, 'MAX_AGE': 0})
+    def test_disabled(self):
+        response = self.client.get('/foods/?page=1&ingredient=egg')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotCached(response)
+
+    def test_canonical_query_redirect(self):
+        response = self.client.get('/foods/?page=1&ingredient=egg&ingredient=bacon')
+
+        self.assertEqual(response.status_code, status.HTTP_302_FOUND)
+        self.assertEqual(response['Location'], '/foods/?ingredient=bacon&ingredient=egg&page=1')
+        self.assertEqual(response['Cache-Control'], 'public, max-age=10')
+
+    @override_settings(ADMISSION_CONTROL={
+        **settings.ADMISSION_CONTROL,
+        'CLASSES': {'cheap': {}, 'expensive': {'RATE': 0.01, 'BURST': 1}},
+    })
+    def test_canonical_query_redirect_admission(self):
+        self.client.get('/foods/?ingredient=egg&ingredient=bacon')
+        response = self.client.get('/foods/?ingredient=bacon&ingredient=egg')
+
+        self.assertCached(response)
+
+    def test_canonical_query_encoding(self):
+        self.assertCached(self.client.get('/foods/?fields=id,name'))
+        self.assertCached(self.client.get('/foods/?ingredient=egg%20white'))
+        self.assertCached(self.client.get('/foods/?fields=id%2Cname&ingredient=egg+white'))
+
+    def test_is_canonical(self):
+        self.assertTrue(cache.is_canonical(''))
+        self.assertTrue(cache.is_canonical('a=2&b=1&b=x%20y'))
+        self.assertFalse(cache.is_canonical('b=1&a=2'))
+        self.assertFalse(cache.is_canonical('a=2&a=1'))
+
+    def test_canonical_query_string(self):
+        self.assertEqual(cache.canonical_query_string(
+            self.client.get('/').wsgi_request.GET), '')
+        request = self.client.get('/ingredients/', {'b': ['2', '1'], 'a': 'x y'}).wsgi_request
+
+        self.assertEqual(cache.canonical_query_string(request.GET), 'a=x+y&b=1&b=2')
+
+
+@override_settings(HTTP_CACHE={**HTTP_CACHE, 'REFRESH_URL': 'http://nginx'}, JOBS_ASYNC=1)
+class HttpCacheRefreshTestCase(TestCase):
+    fixtures = ['data.json']
+
+    def refresh_paths(self):
+        return sorted(path for job in Job.objects.filter(name='refresh_http_cache')
+                      for path in job.kwargs['paths'])
+
+    def test_ingredient_weight_change(self):
+        food, other = Food.objects.all()
+        weight = IngredientWeight.objects.filter(food=food).first()
+        weight.food = other
+        with self.captureOnCommitCallbacks(execute=True):
+            weight.save()
+
+        self.assertEqual(self.refresh_paths(),
+                         sorted(['/foods/', f'/foods/{food.pk}/', f'/foods/{other.pk}/']))
+
+    def test_ingredient_change(self):
+        ingredient = Ingredient.objects.get(name='bacon')
+        ingredient.calories = 1
+        with self.captureOnCommitCallbacks(execute=True):
+            ingredient.save()
+
+        food_paths = [f'/foods/{pk}/' for pk in sorted(ingredient.food_set.values_list('pk', flat=True))]
+        self.assertEqual(self.refresh_paths(),
+                         sorted(['/foods/', *food_paths, '/ingredients/', f'/ingredients/{ingredient.pk}/']))
+
+    @override_settings(HTTP_CACHE=HTTP_CACHE)
+    def test_refresh_disabled(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            Food.objects.create(name='pizza')
+
+        self.assertEqual(self.refresh_paths(), [])
+
+    @override_settings(JOBS_ASYNC=0)
+    @mock.patch('urllib.request.urlopen')
+    def test_refresh_inline_disabled(self, urlopen):
+        with self.captureOnCommitCallbacks(execute=True):
+            Food.objects.create(name='pizza')
+
+        urlopen.assert_not_called()
+
+    @mock.patch('urllib.request.urlopen')
+    def test_refresh(self, urlopen):
+        cache.refresh(['/foods/', '/foods/1/'])
+
+        requests = [call.args[0] for call in urlopen.call_args_list]
+        self.assertEqual([r.full_url for r in requests], ['http://nginx/foods/', 'http://nginx/foods/1/'])
+        for request in requests:
+            self.assertEqual(request.get_header('Host'), 'localhost')
+            self.assertEqual(request.get_header('Accept'), 'application/json')
+            self.assertEqual(request.get_header('X-cache-refresh'), '1')
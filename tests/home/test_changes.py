@@ -0,0 +1,182 @@
+from importlib import import_module
+from unittest import mock
+
+from django.apps import apps
+from django.test import TestCase
+
+from rest_framework import status
+from rest_framework.test import APIRequestFactory
+
+from home.models import Change, Food, Ingredient, IngredientWeight
+from home.views import ChangesView
+
+
+class ChangeRecordTestCase(TestCase):
+
+    def changes(self):
+        return list(Change.objects.values_list('model', 'object_id', 'action'))
+
+    def test_save(self):
+        food = Food.objects.create(name='test_food')
+        food.description = 'changed'
+        food.save()
+
+        self.assertEqual(self.changes(), [('food', food.pk, Change.UPSERT)])
+
+    def test_delete(self):
+        ingredient = Ingredient.objects.create(name='test_ingredient', calories=1)
+        pk = ingredient.pk
+        ingredient.delete()
+
+        self.assertEqual(self.changes(), [('ingredient', pk, Change.DELETE)])
+
+    def test_cascade(self):
+        food = Food.objects.create(name='test_food')
+        ingredient = Ingredient.objects.create(name='test_ingredient', calories=1)
+        weight = IngredientWeight.objects.create(food=food, ingredient=ingredient)
+        food_pk, weight_pk = food.pk, weight.pk
+        food.delete()
+
+        self.assertEqual(self.changes(), [
+            ('ingredient', ingredient.pk, Change.UPSERT),
+            ('ingredientweight', weight_pk, Change.DELETE),
+            ('food', food_pk, Change.DELETE),
+        ])
+
+    def test_m2m(self):
+        food = Food.objects.create(name='test_food')
+        ingredient = Ingredient.objects.create(name='test_ingredient', calories=1)
+        food.ingredients.add(ingredient)
+        weight = IngredientWeight.objects.get()
+        self.assertIn(('ingredientweight', weight.pk, Change.UPSERT), self.changes())
+
+        with mock.patch.object(Change.objects, 'record', wraps=Change.objects.record) as record:
+            ingredient.food_set.clear()
+        self.assertEqual([call for call in record.call_args_list if call.args[0] == 'ingredientweight'],
+                         [mock.call('ingredientweight', {weight.pk}, Change.DELETE)])
+        self.assertIn(('ingredientweight', weight.pk, Change.DELETE), self.changes())
+
+    def test_m2m_remove(self):
+        food = Food.objects.create(name='test_food')
+        ingredient = Ingredient.objects.create(name='test_ingredient', calories=1)
+        food.ingredients.add(ingredient)
+        weight = IngredientWeight.objects.get()
+
+        with mock.patch.object(Change.objects, 'record', wraps=Change.objects.record) as record:
+            food.ingredients.remove(ingredient)
+        self.assertEqual([call for call in record.call_args_list if call.args[0] == 'ingredientweight'],
+                         [mock.call('ingredientweight', {weight.pk}, Change.DELETE)])
+        self.assertIn(('food', food.pk, Change.UPSERT), self.changes())
+
+    def test_nested_ingredients(self):
+        food, other = Food.objects.create(name='test_food'), Food.objects.create(name='other_food')
+        ingredient = Ingredient.objects.create(name='test_ingredient', calories=1)
+        weight = IngredientWeight.objects.create(food=food, ingredient=ingredient)
+
+        weight.food = other
+        weight.save()
+        self.assertEqual(Change.objects.filter(model='food').count(), 2)
+
+        Change.objects.all().delete()
+        ingredient.name = 'renamed'
+        ingredient.save()
+        self.assertIn(('food', other.pk, Change.UPSERT), self.changes())
+
+        Change.objects.all().delete()
+        food.ingredients.add(ingredient)
+        self.assertIn(('food', food.pk, Change.UPSERT), self.changes())
+
+    def test_sequence(self):
+        first = Food.objects.create(name='first')
+        second = Food.objects.create(name='second')
+        first.save()
+
+        self.assertEqual(list(Change.objects.values_list('object_id', flat=True)),
+                         [second.pk, first.pk])
+
+
+class BackfillChangesTestCase(TestCase):
+    fixtures = ['data.json']
+
+    def test_backfill(self):
+        backfill = import_module('home.migrations.0004_backfill_changes').backfill_changes
+        food = Food.objects.first()
+        Change.objects.exclude(model='food', object_id=food.pk).delete()
+        seq = Change.objects.get().seq
+
+        backfill(apps, None)
+        backfill(apps, None)
+
+        changes = list(Change.objects.values_list('model', 'object_id', 'action'))
+        self.assertEqual(changes, [('food', food.pk, Change.UPSERT)] + [
+            (model._meta.model_name, pk, Change.UPSERT)
+            for model in (Ingredient, Food, IngredientWeight)
+            for pk in model.objects.order_by('pk').values_list('pk', flat=True)
+            if (model, pk) != (Food, food.pk)
+        ])
+        self.assertEqual(Change.objects.first().seq, seq)
+
+
+class ChangesViewTestCase(TestCase):
+    fixtures = ['data.json']
+
+    def setUp(self):
+        self.factory = APIRequestFactory()
+        self.view = ChangesView.as_view()
+
+    def get(self, **params):
+        response = self.view(self.factory.get('/changes/', params))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response.data
+
+    def test_changes(self):
+        last_seq = self.get()['last_seq']
+        food = Food.objects.get(name='omelet')
+        food.description = 'eggs'
+        food.save()
+        Ingredient.objects.get(name='chicken').delete()
+
+        data = self.get(since=last_seq)
+        results = data['results']
+
+        self.assertFalse(data['has_more'])
+        self.assertEqual(data['last_seq'], results[-1]['seq'])
+        self.assertEqual([r['seq'] for r in results], sorted(r['seq'] for r in results))
+        upsert = next(r for r in results if r['model'] == 'food')
+        self.assertEqual(upsert['action'], Change.UPSERT)
+        self.assertEqual(upsert['data']['description'], 'eggs')
+        delete = next(r for r in results if r['model'] == 'ingredient')
+        self.assertEqual(delete['action'], Change.DELETE)
+        self.assertIsNone(delete['data'])
+        self.assertEqual(self.get(since=data['last_seq'])['results'], [])
+
+    def test_batches(self):
+        seqs = []
+        data = {'last_seq': 0, 'has_more': True}
+        while data['has_more']:
+            data = self.get(since=data['last_seq'], limit=2)
+            self.assertLessEqual(len(data['results']), 2)
+            seqs.extend(r['seq'] for r in data['results'])
+
+        self.assertEqual(seqs, list(Change.objects.values_list('seq', flat=True)))
+
+    def test_compact(self):
+        data = self.get(compact=1)
+        weight = next(r for r in data['results'] if r['model'] == 'ingredientweight')
+
+        self.assertIsInstance(weight['data']['food'], int)
+
+    def test_invalid(self):
+        response = self.view(self.factory.get('/changes/', {'since': 'x'}))
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_invalid_limit(self):
+        for limit in (0, -5):
+            response = self.view(self.factory.get('/changes/', {'limit': limit}))
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_invalid_since(self):
+        response = self.view(self.factory.get('/changes/', {'since': -1}))
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
@@ -0,0 +1,44 @@
+import json
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+
+from home import jobs
+from home.models import Food
+
+
+class ProfileSearchCommandTestCase(TestCase):
+    fixtures = ['data.json']
+
+    def test_profile_search(self):
+        out = StringIO()
+        call_command('profile_search', 'egg', 'bacon', '--host', 'localhost', stdout=out)
+
+        self.assertIn('Plan:', out.getvalue())
+        self.assertIn(f'Index {Food._meta.indexes[0].name}', out.getvalue())
+        self.assertIn('serialization:', out.getvalue())
+
+    @override_settings(ALLOWED_HOSTS=['*'])
+    def test_profile_search_wildcard_host(self):
+        out = StringIO()
+        call_command('profile_search', 'egg', '--json', stdout=out)
+
+        self.assertEqual(json.loads(out.getvalue())['ingredients'], ['egg'])
+
+    def test_profile_search_json(self):
+        out = StringIO()
+        call_command('profile_search', 'egg', '--host', 'localhost', '--json', stdout=out)
+
+        self.assertEqual(json.loads(out.getvalue())['ingredients'], ['egg'])
+
+
+@override_settings(JOBS_ASYNC=1)
+class RunWorkersCommandTestCase(TestCase):
+
+    def test_stats(self):
+        jobs.enqueue('update_food_vectors', food_ids=[1])
+        out = StringIO()
+        call_command('run_workers', '--stats', stdout=out)
+
+        self.assertEqual(json.loads(out.getvalue())['update_food_vectors']['pending'], 1)
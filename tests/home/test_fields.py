@@ -0,0 +1,84 @@
+from django.test import SimpleTestCase, override_settings
+from django.urls import set_script_prefix
+
+from rest_framework import serializers
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from home.fields import CachedHyperlinkedIdentityField, CachedHyperlinkedRelatedField
+from home.models import Food, Ingredient, IngredientWeight
+
+
+class CachedHyperlinkedFieldTestCase(SimpleTestCase):
+
+    def setUp(self):
+        self.factory = APIRequestFactory()
+        self.request = Request(self.factory.get('/foods/'))
+
+    def tearDown(self):
+        set_script_prefix('/')
+
+    def assertSameUrl(self, cached_field, field, obj, request, format=None):
+        cached = cached_field.get_url(obj, cached_field.view_name, request, format)
+        expected = field.get_url(obj, field.view_name, request, format)
+        self.assertEqual(cached, expected)
+        return cached
+
+    def test_identity(self):
+        cached_field = CachedHyperlinkedIdentityField(view_name='food-detail')
+        field = serializers.HyperlinkedIdentityField(view_name='food-detail')
+
+        url = self.assertSameUrl(cached_field, field, Food(pk=3), self.request)
+        self.assertEqual(url, 'http://testserver/foods/3/')
+        self.assertSameUrl(cached_field, field, Food(pk=42), self.request)
+
+    def test_related(self):
+        kwargs = {'view_name': 'ingredient-detail', 'queryset': Ingredient.objects.all()}
+        cached_field = CachedHyperlinkedRelatedField(**kwargs)
+        field = serializers.HyperlinkedRelatedField(**kwargs)
+
+        self.assertSameUrl(cached_field, field, Ingredient(pk=7), self.request)
+
+    def test_without_request(self):
+        cached_field = CachedHyperlinkedIdentityField(view_name='food-detail')
+        field = serializers.HyperlinkedIdentityField(view_name='food-detail')
+
+        url = self.assertSameUrl(cached_field, field, Food(pk=3), None)
+        self.assertEqual(url, '/foods/3/')
+
+    def test_format(self):
+        cached_field = CachedHyperlinkedIdentityField(view_name='food-detail')
+        field = serializers.HyperlinkedIdentityField(view_name='food-detail')
+
+        url = self.assertSameUrl(cached_field, field, Food(pk=3), self.request, 'json')
+        self.assertEqual(url, 'http://testserver/foods/3.json')
+
+    @override_settings(ALLOWED_HOSTS=['example.com'])
+    def test_other_host(self):
+        cached_field = CachedHyperlinkedIdentityField(view_name='food-detail')
+        field = serializers.HyperlinkedIdentityField(view_name='food-detail')
+        request = Request(self.factory.get('/foods/', secure=True, HTTP_HOST='example.com'))
+
+        url = self.assertSameUrl(cached_field, field, Food(pk=3), request)
+        self.assertEqual(url, 'https://example.com/foods/3/')
+
+    def test_script_prefix(self):
+        set_script_prefix('/api/')
+        cached_field = CachedHyperlinkedIdentityField(view_name='food-detail')
+        field = serializers.HyperlinkedIdentityField(view_name='food-detail')
+
+        url = self.assertSameUrl(cached_field, field, Food(pk=3), self.request)
+        self.assertEqual(url, 'http://testserver/api/foods/3/')
+
+    def test_lookup_field(self):
+        kwargs = {'view_name': 'ingredientweight-detail', 'lookup_field': 'weight',
+                  'lookup_url_kwarg': 'pk'}
+        cached_field = CachedHyperlinkedIdentityField(**kwargs)
+        field = serializers.HyperlinkedIdentityField(**kwargs)
+
+        self.assertSameUrl(cached_field, field, IngredientWeight(pk=1, weight=5), self.request)
+
+    def test_unsaved(self):
+        cached_field = CachedHyperlinkedIdentityField(view_name='food-detail')
+
+        self.assertIsNone(cached_field.get_url(Food(), 'food-detail', self.request, None))
@@ -0,0 +1,168 @@
+import threading
+from datetime import timedelta
+from unittest import mock
+
+from django.db import OperationalError
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from home import jobs
+from home.models import Job
+
+calls = []
+
+
+@jobs.register('test_job')
+def test_job(value):
+    calls.append(value)
+
+
+@jobs.register('test_failing_job')
+def test_failing_job():
+    raise ValueError("failed")
+
+
+class EnqueueTestCase(TestCase):
+
+    def setUp(self):
+        calls.clear()
+
+    def test_enqueue_eager(self):
+        jobs.enqueue('test_job', value=1)
+
+        self.assertEqual(calls, [1])
+        self.assertFalse(Job.objects.exists())
+
+    @override_settings(JOBS_ASYNC=1)
+    def test_enqueue_async(self):
+        jobs.enqueue('test_job', value=1)
+
+        self.assertEqual(calls, [])
+        job = Job.objects.get()
+        self.assertEqual(job.kwargs, {'value': 1})
+        self.assertEqual(job.status, Job.PENDING)
+
+    @override_settings(JOBS_ASYNC=1)
+    def test_enqueue_deduplicated(self):
+        jobs.enqueue('test_job', value=1)
+        jobs.enqueue('test_job', value=1)
+        jobs.enqueue('test_job', value=2)
+
+        self.assertEqual(Job.objects.count(), 2)
+
+    @override_settings(JOBS_ASYNC=1)
+    def test_enqueue_running_not_deduplicated(self):
+        jobs.enqueue('test_job', value=1)
+        jobs.claim()
+        jobs.enqueue('test_job', value=1)
+
+        self.assertEqual(Job.objects.filter(status=Job.PENDING).count(), 1)
+        self.assertEqual(Job.objects.filter(status=Job.RUNNING).count(), 1)
+
+
+@override_settings(JOBS_ASYNC=1, JOBS_MAX_ATTEMPTS=2)
+class WorkerTestCase(TestCase):
+
+    def setUp(self):
+        calls.clear()
+
+    def test_claim(self):
+        jobs.enqueue('test_job', value=1)
+        job, = jobs.claim()
+
+        self.assertEqual(job.status, Job.RUNNING)
+        self.assertEqual(job.attempts, 1)
+        self.assertEqual(jobs.claim(), [])
+
+    def test_claim_not_ready(self):
+        Job.objects.create(name='test_job', key='k', kwargs={'value': 1},
+                           run_at=timezone.now() + timedelta(minutes=1))
+
+        self.assertEqual(jobs.claim(), [])
+
+    def test_run(self):
+        jobs.enqueue('test_job', value=1)
+        job, = jobs.claim()
+
+        self.assertTrue(jobs.run(job))
+        self.assertEqual(calls, [1])
+        self.assertFalse(Job.objects.exists())
+
+    def test_run_retry(self):
+        jobs.enqueue('test_failing_job')
+        job, = jobs.claim()
+
+        self.assertFalse(jobs.run(job))
+        job.refresh_from_db()
+        self.assertEqual(job.status, Job.PENDING)
+        self.assertIn('ValueError', job.last_error)
+        self.assertGreater(job.run_at, timezone.now())
+
+    def test_run_failed(self):
+        jobs.enqueue('test_failing_job')
+        job = Job.objects.get()
+        for _ in range(2):
+            Job.objects.update(run_at=timezone.now())
+            job, = jobs.claim()
+            jobs.run(job)
+
+        job.refresh_from_db()
+        self.assertEqual(job.status, Job.FAILED)
+        self.assertEqual(job.attempts, 2)
+
+    def test_retry_deduplicated(self):
+        jobs.enqueue('test_failing_job')
+        job, = jobs.claim()
+        jobs.enqueue('test_failing_job')
+        jobs.run(job)
+
+        self.assertEqual(Job.objects.count(), 1)
+
+    def test_backoff(self):
+        with self.settings(JOBS_RETRY_BACKOFF=2, JOBS_RETRY_BACKOFF_MAX=10):
+            self.assertEqual([jobs.backoff(i) for i in range(1, 5)], [2, 4, 8, 10])
+
+    def test_requeue_stale(self):
+        jobs.enqueue('test_job', value=1)
+        jobs.claim()
+        Job.objects.update(locked_at=timezone.now() - timedelta(hours=1))
+        jobs.requeue_stale(60)
+
+        self.assertEqual(Job.objects.get().status, Job.PENDING)
+
+    def test_work_once(self):
+        jobs.enqueue('test_job', value=1)
+        jobs.enqueue('test_job', value=2)
+        with mock.patch('home.jobs.connection'):
+            jobs.work(threading.Event(), once=True)
+
+        self.assertEqual(sorted(calls), [1, 2])
+
+    def test_work_survives_errors(self):
+        jobs.enqueue('test_job', value=1)
+        claim = jobs.claim
+        errors = [OperationalError("server closed the connection unexpectedly")]
+
+        def flaky_claim(limit=1):
+            if errors:
+                raise errors.pop()
+            return claim(limit)
+
+        with mock.patch('home.jobs.connection'), mock.patch('home.jobs.close_old_connections'), \
+                mock.patch('home.jobs.claim', flaky_claim), self.assertLogs('home.jobs', 'ERROR'):
+            jobs.work(threading.Event(), poll_interval=0, once=True)
+
+        self.assertEqual(calls, [1])
+
+    def test_stats(self):
+        jobs.enqueue('test_job', value=1)
+        jobs.enqueue('test_job', value=2)
+        jobs.claim()
+        Job.objects.filter(status=Job.PENDING).update(run_at=timezone.now() - timedelta(seconds=30))
+
+        stats = Job.objects.all().stats()['test_job']
+        self.assertEqual(stats['pending'], 1)
+        self.assertEqual(stats['ready'], 1)
+        self.assertEqual(stats['running'], 1)
+        self.assertEqual(stats['failed'], 0)
+        self.assertGreaterEqual(stats['latency'], 30)
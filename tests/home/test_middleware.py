@@ -0,0 +1,174 @@
+import secrets
+
+from django.contrib.auth.models import User
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase, TestCase, override_settings
+from django.urls import resolve
+
+from rest_framework import status
+from rest_framework.authtoken.models import Token
+
+from home import metrics
+from home.middleware import AdmissionControlMiddleware, TokenBucket, redact
+
+ADMISSION_CONTROL = {
+    'ENABLED': True,
+    'CLASSES': {
+        'cheap': {},
+        'expensive': {'RATE': 0.01, 'BURST': 2, 'CONCURRENCY': 1},
+    },
+    'ROUTES': {
+        'food-list?ingredient': 'expensive',
+    },
+    'DEFAULT_CLASS': 'cheap',
+    'MAX_CLIENTS': 2,
+}
+
+
+class TokenBucketTestCase(SimpleTestCase):
+
+    def test_take(self):
+        bucket = TokenBucket(rate=1, burst=2)
+
+        self.assertEqual(bucket.take(), 0)
+        self.assertEqual(bucket.take(), 0)
+        self.assertGreater(bucket.take(), 0.9)
+
+    def test_refill(self):
+        bucket = TokenBucket(rate=1, burst=1)
+        bucket.take()
+        bucket.updated -= 1
+
+        self.assertEqual(bucket.take(), 0)
+
+
+class RedactTestCase(SimpleTestCase):
+
+    def test_redact(self):
+        data = {
+            'username': 'what_cook',
+            'new_password': 'a', 'old_password': 'b', 'Token': 'c',
+            'items': [{'access_token': 'd', 'refresh_token': 'e'}],
+        }
+
+        self.assertEqual(redact(data, ['password', 'token']), {
+            'username': 'what_cook',
+            'new_password': '[redacted]', 'old_password': '[redacted]', 'Token': '[redacted]',
+            'items': [{'access_token': '[redacted]', 'refresh_token': '[redacted]'}],
+        })
+
+
+@override_settings(ADMISSION_CONTROL=ADMISSION_CONTROL)
+class AdmissionControlMiddlewareTestCase(TestCase):
+
+    def setUp(self):
+        metrics.reset()
+        self.factory = RequestFactory()
+        self.middleware = AdmissionControlMiddleware(lambda request: HttpResponse())
+
+    def process(self, path, **extra):
+        request = self.factory.get(path, **extra)
+        request.resolver_match = resolve(request.path)
+        return request, self.middleware.process_view(request, None, (), {})
+
+    def test_cheap(self):
+        for _ in range(10):
+            _, response = self.process('/foods/')
+            self.assertIsNone(response)
+
+        self.assertEqual(metrics.snapshot(), {'admission.cheap.admitted': 10})
+
+    def test_throttled(self):
+        for _ in range(2):
+            request, response = self.process('/foods/?ingredient=egg')
+            self.assertIsNone(response)
+            request._admission_semaphore.release()
+
+        _, response = self.process('/foods/?ingredient=egg')
+
+        self.assertEqual(response.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+        self.assertGreater(int(response['Retry-After']), 1)
+        self.assertEqual(metrics.snapshot()['admission.expensive.throttled'], 1)
+
+    def test_throttled_per_client(self):
+        token_a = Token.objects.create(user=User.objects.create_user('test_user_a')).key
+        token_b = Token.objects.create(user=User.objects.create_user('test_user_b')).key
+        for token in (token_a, token_a, token_b):
+            request, response = self.process('/foods/?ingredient=egg',
+                                             HTTP_AUTHORIZATION=f'Token {token}')
+            self.assertIsNone(response)
+            request._admission_semaphore.release()
+
+        _, response = self.process('/foods/?ingredient=egg', HTTP_AUTHORIZATION=f'Token {token_a}')
+        self.assertEqual(response.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+
+        _, response = self.process('/foods/?ingredient=egg', REMOTE_ADDR='10.0.0.1')
+        self.assertIsNone(response)
+
+    def test_throttled_unknown_tokens(self):
+        for _ in range(2):
+            request, response = self.process('/foods/?ingredient=egg',
+                                             HTTP_AUTHORIZATION=f'Token {secrets.token_hex(20)}')
+            self.assertIsNone(response)
+            request._admission_semaphore.release()
+
+        _, response = self.process('/foods/?ingredient=egg', HTTP_AUTHORIZATION='Token unknown')
+        self.assertEqual(response.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+
+    def test_shed(self):
+        self.process('/foods/?ingredient=egg')
+        _, response = self.process('/foods/?ingredient=egg', REMOTE_ADDR='10.0.0.1')
+
+        self.assertEqual(response.status_code, status.HTTP_503_SERVICE_UNAVAILABLE)
+        self.assertEqual(response['Retry-After'], '1')
+        self.assertEqual(metrics.snapshot()['admission.expensive.shed'], 1)
+
+    def test_release(self):
+        request = self.factory.get('/foods/', {'ingredient': 'egg'})
+        semaphore = self.middleware.semaphores['expensive']
+
+        def get_response(request):
+            request.resolver_match = resolve(request.path)
+            self.middleware.process_view(request, None, (), {})
+            return HttpResponse()
+
+        self.middleware.get_response = get_response
+        self.middleware(request)
+
+        self.assertTrue(semaphore.acquire(blocking=False))
+
+    def test_get_client(self):
+        request = self.factory.get('/', HTTP_X_FORWARDED_FOR='1.1.1.1, 2.2.2.2')
+
+        self.assertEqual(AdmissionControlMiddleware.get_client(request), 'ip:2.2.2.2')
+
+    def test_max_clients(self):
+        for address in ('10.0.0.1', '10.0.0.2', '10.0.0.3'):
+            request, _ = self.process('/foods/?ingredient=egg', REMOTE_ADDR=address)
+            request._admission_semaphore.release()
+
+        self.assertEqual(len(self.middleware.buckets), 2)
+
+    @override_settings(ADMISSION_CONTROL={**ADMISSION_CONTROL, 'ENABLED': False})
+    def test_disabled(self):
+        middleware = AdmissionControlMiddleware(lambda request: HttpResponse())
+        for _ in range(5):
+            request = self.factory.get('/foods/', {'ingredient': 'egg'})
+            self.assertIsNone(middleware.process_view(request, None, (), {}))
+
+
+class MetricsViewTestCase(TestCase):
+    fixtures = ['data.json']
+
+    def test_metrics(self):
+        self.client.force_login(User.objects.get(username='what_cook'))
+        response = self.client.get('/metrics/')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIn('admission.cheap.admitted', response.json()['counters'])
+        self.assertIn('jobs', response.json())
+
+    def test_metrics_admin_only(self):
+        response = self.client.get('/metrics/')
+
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
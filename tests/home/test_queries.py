@@ -0,0 +1,89 @@
+from django.contrib.auth.models import User
+from django.urls import get_resolver
+from django.urls.resolvers import URLResolver
+
+from home import urls
+from home.models import Food, IngredientWeight
+
+from .utils import ModelViewSetTestCase, seed_catalog
+
+# url name -> (url, most queries allowed), the placeholders are filled in by QueryCountTestCase.url
+QUERY_BUDGETS = {
+    'api-root': ('/', 0),
+    'food-list': ('/foods/', 3),
+    'food-detail': ('/foods/{food}/', 2),
+    'food-search-profile': ('/foods/search/profile/?ingredient={ingredient}', 4),
+    'ingredient-list': ('/ingredients/', 2),
+    'ingredient-detail': ('/ingredients/{ingredient_id}/', 1),
+    'ingredientweight-list': ('/ingredient_weights/', 2),
+    'ingredientweight-detail': ('/ingredient_weights/{weight}/', 1),
+    'changes': ('/changes/', 5),
+    'metrics': ('/metrics/', 1),
+}
+
+
+def url_names(patterns):
+    for pattern in patterns:
+        if isinstance(pattern, URLResolver):
+            yield from url_names(pattern.url_patterns)
+        elif pattern.name:
+            yield pattern.name
+
+
+class QueryCountTestCase(ModelViewSetTestCase):
+
+    def setUp(self):
+        food_objs, ingredient_objs = seed_catalog(foods=25, ingredients=25)
+        self.food = food_objs[0]
+        self.ingredient = ingredient_objs[0]
+        self.weight = IngredientWeight.objects.filter(food=self.food).first()
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.auth_user = User.objects.create_superuser('test_admin', 'test_admin@example.com', 'pass')
+
+    def url(self, name):
+        url, _ = QUERY_BUDGETS[name]
+        return url.format(food=self.food.pk, ingredient=self.ingredient.name, ingredient_id=self.ingredient.pk,
+                          weight=self.weight.pk)
+
+    def test_budgets_cover_routes(self):
+        self.assertEqual(set(url_names(get_resolver(urls).url_patterns)), set(QUERY_BUDGETS))
+
+    def test_budgets(self):
+        for name, (_, num) in QUERY_BUDGETS.items():
+            with self.subTest(name):
+                with self.assertMaxQueries(num, label=name):
+                    response = self.request('GET', self.url(name))
+                self.assertEqual(response.status_code, 200)
+
+    def test_search(self):
+        with self.assertMaxQueries(3, exact=True, label='food-list?ingredient'):
+            response = self.request('GET', f'/foods/?ingredient={self.ingredient.name}')
+        self.assertTrue(response.data['results'])
+
+    def test_writes(self):
+        with self.assertMaxQueries(25, label='food-list POST'):
+            response = self.request('POST', '/foods/', {'name': 'test_food'})
+        self.assertEqual(response.status_code, 201)
+
+        with self.assertMaxQueries(11, label='food-detail DELETE'):
+            response = self.request('DELETE', f"/foods/{response.data['id']}/")
+        self.assertEqual(response.status_code, 204)
+
+    def test_page_size(self):
+        # the second pages of the foods and the ingredients hold 10 objects, the third ones 5
+        for name in ('food-list', 'ingredient-list', 'ingredientweight-list'):
+            with self.subTest(name):
+                url = self.url(name)
+                self.assertSameQueries(f'{url}?page=2', f'{url}?page=3')
+        self.assertSameQueries('/changes/?limit=2', '/changes/?limit=1000')
+
+
+class QueryPlanTestCase(ModelViewSetTestCase):
+
+    def test_search_uses_gin_index(self):
+        _, ingredient_objs = seed_catalog(foods=3000, ingredients=50)
+        queryset = Food.objects.all().search([ingredient_objs[0].name])
+
+        self.assertUsesIndex(queryset, Food._meta.indexes[0].name)
@@ -0,0 +1,43 @@
+import json
+from decimal import Decimal
+
+import msgpack
+
+from django.test import SimpleTestCase
+from django.utils.translation import gettext_lazy
+
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils.serializer_helpers import ReturnDict
+
+from home.renderers import MessagePackRenderer, ORJSONRenderer
+
+DATA = ReturnDict({
+    'id': 1,
+    'name': gettext_lazy('carbonara'),
+    'weight': Decimal('1.5'),
+    'ingredients': [{'name': 'bacon', 'absent': False}],
+}, serializer=None)
+
+
+class ORJSONRendererTestCase(SimpleTestCase):
+
+    def test_render(self):
+        rendered = ORJSONRenderer().render(DATA)
+
+        self.assertEqual(json.loads(rendered), json.loads(JSONRenderer().render(DATA)))
+
+    def test_render_indent(self):
+        rendered = ORJSONRenderer().render(DATA, 'application/json; indent=4')
+
+        self.assertIn(b'\n  ', rendered)
+
+    def test_render_none(self):
+        self.assertEqual(ORJSONRenderer().render(None), b'')
+
+
+class MessagePackRendererTestCase(SimpleTestCase):
+
+    def test_render(self):
+        rendered = MessagePackRenderer().render(DATA)
+
+        self.assertEqual(msgpack.unpackb(rendered), json.loads(JSONRenderer().render(DATA)))
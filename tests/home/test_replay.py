@@ -0,0 +1,98 @@
+import json
+import os
+import tempfile
+from io import StringIO
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.test import TestCase
+
+from home import replay
+
+REQUEST_LOG = {
+    'PATH': None,
+    'SAMPLE_RATE': 1,
+    'REDACT_FIELDS': ['password'],
+    'MAX_BODY_SIZE': 10000,
+}
+
+
+class ReplayTestCase(TestCase):
+    fixtures = ['data.json']
+
+    def setUp(self):
+        fd, self.path = tempfile.mkstemp(suffix='.jsonl')
+        os.close(fd)
+
+    def tearDown(self):
+        os.remove(self.path)
+
+    def read_log(self):
+        with open(self.path) as f:
+            return [json.loads(line) for line in f]
+
+    def test_log(self):
+        with self.settings(REQUEST_LOG={**REQUEST_LOG, 'PATH': self.path}):
+            self.client.get('/foods/', {'ingredient': ['bacon', 'egg']})
+            self.client.post('/api-token-auth/', {'username': 'what_cook', 'password': 'secret'},
+                             content_type='application/json')
+
+        search, login = self.read_log()
+        self.assertEqual(search['method'], 'GET')
+        self.assertEqual(search['path'], '/foods/')
+        self.assertEqual(search['query'], {'ingredient': ['bacon', 'egg']})
+        self.assertEqual(search['status'], 200)
+        self.assertIsNone(search['auth'])
+        self.assertGreater(search['latency_ms'], 0)
+        self.assertEqual(login['body'], {'username': 'what_cook', 'password': '[redacted]'})
+
+    def test_log_authenticator(self):
+        self.client.force_login(User.objects.get(username='what_cook'))
+        with self.settings(REQUEST_LOG={**REQUEST_LOG, 'PATH': self.path}):
+            self.client.get('/ingredients/')
+
+        self.assertEqual(self.read_log()[0]['auth'], 'SessionAuthentication')
+
+    def test_log_sampling(self):
+        with self.settings(REQUEST_LOG={**REQUEST_LOG, 'PATH': self.path, 'SAMPLE_RATE': 0}):
+            self.client.get('/foods/')
+
+        self.assertEqual(self.read_log(), [])
+
+    def write_log(self, entries):
+        with open(self.path, 'w') as f:
+            f.writelines(json.dumps(entry) + '\n' for entry in entries)
+
+    def test_replay(self):
+        self.write_log([
+            {'method': 'GET', 'path': '/foods/', 'query': {'ingredient': ['egg']}},
+            {'method': 'GET', 'path': '/foods/1/', 'query': {}},
+            {'method': 'GET', 'path': '/foods/0/', 'query': {}},
+            {'method': 'DELETE', 'path': '/foods/1/', 'query': {}},
+        ])
+        entries = replay.load(self.path, ['GET'])
+        results = replay.replay(entries, replay.InProcessClient())
+
+        self.assertEqual(sorted((route, status) for route, status, _ in results),
+                         [('food-detail', 200), ('food-detail', 404), ('food-list', 200)])
+
+        summary = replay.summarize(results)
+        self.assertEqual(summary['food-detail']['requests'], 2)
+        self.assertEqual(summary['food-detail']['client_errors'], 0.5)
+        self.assertEqual(summary['food-list']['errors'], 0)
+
+    def test_replay_command(self):
+        self.write_log([{'method': 'GET', 'path': '/ingredients/', 'query': {}}] * 3)
+        out = StringIO()
+        call_command('replay_traffic', self.path, '--rate', '1000', '--json', stdout=out)
+
+        self.assertEqual(json.loads(out.getvalue())['ingredient-list']['requests'], 3)
+
+    def test_percentile(self):
+        values = list(range(1, 101))
+
+        self.assertEqual(replay.percentile(values, 50), 50)
+        self.assertEqual(replay.percentile(values, 99), 99)
+        self.assertEqual(replay.percentile([5], 90), 5)
+        self.assertEqual(replay.percentile([5, 1, 4, 2, 3], 50), 3)
+        self.assertEqual(replay.percentile([1, 2, 3, 4, 5], 90), 5)
@@ -0,0 +1,124 @@
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from home.models import Food, Ingredient, IngredientWeight
+
+
+class FoodVectorSignalsTestCase(TestCase):
+
+    def setUp(self):
+        self.food = Food.objects.create(name='test_food')
+        self.ingredients = [Ingredient.objects.create(name=f'test_ingredient{i}', calories=100)
+                            for i in range(1, 4)]
+
+    def assertFoodFound(self, *ingredients):
+        self.assertIn(self.food, Food.objects.all().search(ingredients))
+
+    def assertFoodNotFound(self, *ingredients):
+        self.assertNotIn(self.food, Food.objects.all().search(ingredients))
+
+    def test_save_coalesced(self):
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            for ingredient in self.ingredients:
+                IngredientWeight.objects.create(food=self.food, ingredient=ingredient)
+
+        with CaptureQueriesContext(connection) as queries:
+            for callback in callbacks:
+                callback()
+
+        self.assertEqual(len(queries), 0)
+        self.assertFoodFound('test_ingredient1', 'test_ingredient3')
+
+    def test_save_single_update(self):
+        with CaptureQueriesContext(connection) as queries:
+            with self.captureOnCommitCallbacks(execute=True):
+                for ingredient in self.ingredients:
+                    IngredientWeight.objects.create(food=self.food, ingredient=ingredient)
+
+        updates = [q['sql'] for q in queries if q['sql'].startswith('UPDATE')]
+        self.assertEqual(len(updates), 1)
+        self.assertIn('"_ingredients_vector"', updates[0])
+        self.assertNotIn('"description"', updates[0])
+
+    def test_delete(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            weight = IngredientWeight.objects.create(food=self.food, ingredient=self.ingredients[0])
+        with self.captureOnCommitCallbacks(execute=True):
+            weight.delete()
+
+        self.assertFoodNotFound('test_ingredient1')
+
+    def test_move_to_other_food(self):
+        other = Food.objects.create(name='other_food')
+        with self.captureOnCommitCallbacks(execute=True):
+            IngredientWeight.objects.create(food=self.food, ingredient=self.ingredients[0])
+
+        weight = IngredientWeight.objects.get(food=self.food)
+        weight.food = other
+        with self.captureOnCommitCallbacks(execute=True):
+            weight.save()
+
+        self.assertFoodNotFound('test_ingredient1')
+        self.assertIn(other, Food.objects.all().search(['test_ingredient1']))
+
+    def test_move_twice(self):
+        other, third = Food.objects.create(name='other_food'), Food.objects.create(name='third_food')
+        with self.captureOnCommitCallbacks(execute=True):
+            IngredientWeight.objects.create(food=self.food, ingredient=self.ingredients[0])
+
+        weight = IngredientWeight.objects.get(food=self.food)
+        for food in (other, third):
+            weight.food = food
+            with self.captureOnCommitCallbacks(execute=True):
+                weight.save()
+
+        self.assertNotIn(other, Food.objects.all().search(['test_ingredient1']))
+        self.assertIn(third, Food.objects.all().search(['test_ingredient1']))
+
+    def test_ingredient_rename(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.food.ingredients.add(*self.ingredients)
+
+        ingredient = Ingredient.objects.get(pk=self.ingredients[0].pk)
+        ingredient.name = 'renamed'
+        with self.captureOnCommitCallbacks(execute=True):
+            ingredient.save()
+
+        self.assertFoodFound('renamed')
+        self.assertFoodNotFound('test_ingredient1')
+
+    def test_ingredient_rename_back(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.food.ingredients.add(*self.ingredients)
+
+        ingredient = Ingredient.objects.get(pk=self.ingredients[0].pk)
+        for name in ('renamed', 'test_ingredient1'):
+            ingredient.name = name
+            with self.captureOnCommitCallbacks(execute=True):
+                ingredient.save()
+
+        self.assertFoodFound('test_ingredient1')
+        self.assertFoodNotFound('renamed')
+
+    def test_ingredient_calories_change(self):
+        ingredient = Ingredient.objects.get(pk=self.ingredients[0].pk)
+        ingredient.calories = 200
+        with self.captureOnCommitCallbacks() as callbacks:
+            ingredient.save()
+
+        self.assertEqual(callbacks, [])
+
+    def test_m2m_remove_and_clear(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.food.ingredients.add(*self.ingredients)
+        self.assertFoodFound('test_ingredient2')
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.food.ingredients.remove(self.ingredients[1])
+        self.assertFoodNotFound('test_ingredient2')
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.ingredients[0].food_set.clear()
+        self.assertFoodNotFound('test_ingredient1')
+        self.assertFoodFound('test_ingredient3')
@@ -1,3 +1,5 @@
+import msgpack
+
 from django.contrib.auth.models import User
 from django.core.exceptions import ObjectDoesNotExist
 
@@ -60,6 +62,12 @@ class IngredientViewSetTestCase(ModelViewSetTestCase):
         self.assertResponseHasErrorCodes(response, {'name': self.CODE_REQUIRED,
                                                     'calories': self.CODE_REQUIRED})
 
+    def test_create_fields(self):
+        response = self.post("/ingredients?fields=id", {'name': 'water'})
+
+        self.assertResponseIsJson(response, status.HTTP_400_BAD_REQUEST)
+        self.assertResponseHasErrorCodes(response, {'calories': self.CODE_REQUIRED})
+
     def test_create_name_blank(self):
         response = self.post("/ingredients", {'name': self.STR_BLANK})
 
@@ -140,6 +148,24 @@ class IngredientWeightViewSetTestCase(ModelViewSetTestCase):
             model_object.weight == serialize_data.get('weight') and \
             serialize_data.get('ingredient').endswith(ingredient_url)
 
+    def test_list_compact(self):
+        response = self.get_list("/ingredient_weights?compact=1")
+
+        self.assertResponseIsJson(response, status.HTTP_200_OK)
+        for data in response.data['results']:
+            obj = self.queryset.get(pk=data['id'])
+            self.assertEqual(data, {'id': obj.pk, 'food': obj.food_id,
+                                    'ingredient': obj.ingredient_id, 'weight': obj.weight})
+
+    def test_create_compact(self):
+        response = self.post("/ingredient_weights?compact=1", {'food': self.food.id,
+                                                               'weight': 100,
+                                                               'ingredient': self.ingredient.id})
+
+        self.assertResponseIsJson(response, status.HTTP_201_CREATED)
+        obj = self.queryset.get(pk=response.data['id'])
+        self.assertEqual((obj.food_id, obj.ingredient_id), (self.food.id, self.ingredient.id))
+
     def test_create(self):
         food_url = f"http://testserver/foods/{self.food.id}/"
         ingredient_url = f"https://testserver/ingredients/{self.ingredient.id}/"
@@ -226,6 +252,60 @@ class FoodViewSetTestCase(ModelViewSetTestCase):
                                     self.queryset,
                                     self.is_correct_serialize)
 
+    def test_list_fields(self):
+        response = self.get_list("/foods?fields=id,name,unknown")
+
+        self.assertResponseIsJson(response, status.HTTP_200_OK)
+        for data in response.data['results']:
+            self.assertEqual(list(data), ['id', 'name'])
+
+    def test_list_omit(self):
+        response = self.get_list("/foods?omit=ingredients,url")
+
+        self.assertResponseIsJson(response, status.HTTP_200_OK)
+        for data in response.data['results']:
+            self.assertEqual(list(data), ['id', 'name', 'description'])
+
+    def test_list_compact(self):
+        response = self.get_list("/foods?compact=true")
+
+        self.assertResponseIsJson(response, status.HTTP_200_OK)
+        for data in response.data['results']:
+            self.assertNotIn('url', data)
+            food = self.queryset.get(pk=data['id'])
+            self.assertEqual({i['id'] for i in data['ingredients']},
+                             set(food.ingredients.values_list('id', flat=True)))
+            for ingredient in data['ingredients']:
+                self.assertNotIn('url', ingredient)
+
+    def test_list_msgpack(self):
+        request = self.factory.get("/foods", HTTP_ACCEPT='application/msgpack')
+        response = self.view(request)
+
+        data = msgpack.unpackb(response.rendered_content)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response['content-type'], 'application/msgpack')
+        self.assertEqual(data['count'], self.queryset.count())
+
+    def test_search(self):
+        response = self.get_list("/foods?ingredient=egg&ingredient=bacon")
+
+        self.assertResponseIsJson(response, status.HTTP_200_OK)
+        self.assertEqual([r['name'] for r in response.data['results']], ['omelet'])
+        self.assertTrue(self.is_correct_serialize(self.queryset.get(name='omelet'),
+                                                  response.data['results'][0]))
+
+    def test_search_fields(self):
+        response = self.get_list("/foods?ingredient=bacon&fields=name,ingredients&compact=1")
+
+        self.assertResponseIsJson(response, status.HTTP_200_OK)
+        for data in response.data['results']:
+            self.assertEqual(list(data), ['name', 'ingredients'])
+            for ingredient in data['ingredients']:
+                self.assertEqual(list(ingredient), ['id', 'name', 'calories', 'absent'])
+                self.assertEqual(ingredient['absent'], ingredient['name'] != 'bacon')
+
     def is_correct_serialize(self, food, serialize_data) -> bool:
         ingrs = {i.id: i for i in food.ingredients.all()}
         for ingredient_data in serialize_data.get('ingredients'):
@@ -256,6 +336,18 @@ class FoodViewSetTestCase(ModelViewSetTestCase):
         self.assertResponseIsJson(response, status.HTTP_400_BAD_REQUEST)
         self.assertResponseHasErrorCodes(response, {'name': self.CODE_REQUIRED})
 
+    def test_create_omit(self):
+        response = self.post("/foods/?omit=name", {})
+
+        self.assertResponseIsJson(response, status.HTTP_400_BAD_REQUEST)
+        self.assertResponseHasErrorCodes(response, {'name': self.CODE_REQUIRED})
+
+    def test_create_omit_output(self):
+        response = self.post("/foods/?omit=url", {'name': 'pizza'})
+
+        self.assertResponseIsJson(response, status.HTTP_201_CREATED)
+        self.assertIn('url', response.data)
+
     def test_create_name_blank(self):
         response = self.post("/foods/", {'name': self.STR_BLANK})
 
@@ -290,3 +382,42 @@ class FoodViewSetTestCase(ModelViewSetTestCase):
         with self.assertRaises(ObjectDoesNotExist):
             self.queryset.get(pk=self.obj.pk)
 
+
+class FoodSearchProfileTestCase(ModelViewSetTestCase):
+    fixtures = ['data.json']
+
+    def setUp(self):
+        self.view = FoodViewSet.as_view({'get': 'profile_search'}, **FoodViewSet.profile_search.kwargs)
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.auth_user = User.objects.get(username='what_cook')
+
+    def test_profile(self):
+        response = self.get_list("/foods/search/profile?ingredient=egg&ingredient=bacon")
+
+        self.assertResponseIsJson(response, status.HTTP_200_OK)
+        self.assertEqual(response.data['ingredients'], ['egg', 'bacon'])
+        self.assertIn("'egg bacon'", response.data['sql'])
+        self.assertIn('LIMIT 10', response.data['sql'])
+        self.assertIn('Buffers', response.data['plan'])
+        self.assertTrue(response.data['plan'].startswith('Limit'))
+        self.assertEqual(list(response.data['indexes']), [Food._meta.indexes[0].name])
+        self.assertEqual(list(response.data['stages']), ['filter', 'pagination', 'serialization'])
+        self.assertEqual(response.data['stages']['filter']['queries'], 0)
+        # the count, the page and the prefetched ingredients
+        self.assertEqual(response.data['stages']['pagination']['queries'], 3)
+        self.assertEqual(response.data['stages']['serialization']['queries'], 0)
+        self.assertEqual(response.data['total']['queries'],
+                         sum(s['queries'] for s in response.data['stages'].values()))
+
+    def test_profile_ingredient_required(self):
+        response = self.get_list("/foods/search/profile")
+
+        self.assertResponseIsJson(response, status.HTTP_400_BAD_REQUEST)
+
+    def test_profile_admin_only(self):
+        self.auth_user = User.objects.get(username='AnonymousUser')
+        response = self.get_list("/foods/search/profile?ingredient=egg")
+
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
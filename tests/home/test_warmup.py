@@ -0,0 +1,19 @@
+from django.test import SimpleTestCase
+
+from home import fields
+from home.warmup import STAGES, warm_up
+
+
+class WarmUpTestCase(SimpleTestCase):
+
+    def test_warm_up(self):
+        timings = warm_up()
+
+        self.assertEqual(list(timings), [name for name, _ in STAGES])
+        for seconds in timings.values():
+            self.assertGreaterEqual(seconds, 0)
+
+    def test_url_templates(self):
+        warm_up()
+
+        self.assertIn('food-detail', {key[2] for key in fields._url_templates})
@@ -1,11 +1,44 @@
+import difflib
 import json
+import re
+from collections import Counter
+from contextlib import contextmanager
+from urllib.parse import urlsplit
 
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import resolve
 
 from rest_framework.test import APIRequestFactory, force_authenticate
 from rest_framework import status
 from rest_framework.viewsets import ModelViewSet
 
+from home.models import Food, Ingredient, IngredientWeight
+
+
+def seed_catalog(foods=30, ingredients=20, ingredients_per_food=4):
+    """Bulk create a catalog with search vectors and fresh planner statistics."""
+    ingredient_objs = Ingredient.objects.bulk_create([
+        Ingredient(name=f'seed_ingredient{i}', calories=i) for i in range(ingredients)
+    ])
+    food_objs = Food.objects.bulk_create([Food(name=f'seed_food{i}') for i in range(foods)])
+    IngredientWeight.objects.bulk_create([
+        IngredientWeight(food=food, ingredient=ingredient_objs[(i + j) % ingredients], weight=j)
+        for i, food in enumerate(food_objs) for j in range(ingredients_per_food)
+    ])
+    Food.objects.filter(pk__in=[food.pk for food in food_objs]).update_vectors()
+    with connection.cursor() as cursor:
+        cursor.execute('ANALYZE')
+    return food_objs, ingredient_objs
+
+
+def normalize_sql(sql):
+    """Replace literals, so that queries differing only in parameters compare equal."""
+    sql = re.sub(r"'(?:[^']|'')*'", '?', sql)
+    sql = re.sub(r'\b\d+\b', '?', sql)
+    return re.sub(r'IN \((?:\?, )*\?\)', 'IN (...)', sql)
+
 
 class ModelViewSetTestCase(TestCase):
     STR_LONG = 'L' * 256
@@ -50,6 +83,53 @@ class ModelViewSetTestCase(TestCase):
         force_authenticate(request, user=self.auth_user)
         return self.view(request, pk=pk)
 
+    def request(self, method, url, data=None):
+        """Send the request to the view ``url`` resolves to, as the url resolver would."""
+        request = getattr(self.factory, method.lower())(url, data, format='json')
+        force_authenticate(request, user=self.auth_user)
+        match = request.resolver_match = resolve(urlsplit(url).path)
+        response = match.func(request, *match.args, **match.kwargs)
+        response.render()
+        return response
+
+    @contextmanager
+    def assertMaxQueries(self, num, exact=False, label=''):
+        """Fail when more (or, if ``exact``, other) than ``num`` queries run in the block."""
+        with CaptureQueriesContext(connection) as context:
+            yield context
+
+        executed = [query['sql'] for query in context.captured_queries]
+        if len(executed) == num or (not exact and len(executed) < num):
+            return
+
+        expected = f"{num} queries" if exact else f"at most {num} queries"
+        lines = [f"{label}: {expected} expected, {len(executed)} executed:"]
+        lines += [f"  {i}. {sql}" for i, sql in enumerate(executed, 1)]
+        repeated = [(count, sql) for sql, count in Counter(map(normalize_sql, executed)).items()
+                    if count > 1]
+        if repeated:
+            lines.append("repeated:")
+            lines += [f"  {count}x {sql}" for count, sql in repeated]
+        self.fail("\n".join(lines))
+
+    def assertSameQueries(self, first_url, second_url, method='GET'):
+        """Fail with a diff unless both requests run the same queries, e.g. pages of different sizes."""
+        queries = []
+        for url in (first_url, second_url):
+            with CaptureQueriesContext(connection) as context:
+                self.request(method, url)
+            queries.append([normalize_sql(query['sql']) for query in context.captured_queries])
+
+        if queries[0] != queries[1]:
+            diff = difflib.unified_diff(*queries, fromfile=first_url, tofile=second_url, lineterm='')
+            self.fail("queries differ:\n" + "\n".join(diff))
+
+    def assertUsesIndex(self, queryset, *index_names):
+        """Fail unless the plan of the queryset uses one of the indexes."""
+        plan = queryset.explain()
+        if not any(name in plan for name in index_names):
+            self.fail(f"none of {', '.join(index_names)} used by:\n{queryset.query}\n{plan}")
+
     def assertCorrectSerialize(self, results, queryset, comparison: callable):
         ids = [r['id'] for r in results]
         objs = {obj.pk: obj for obj in queryset.filter(id__in=ids)}